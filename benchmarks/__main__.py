@@ -0,0 +1,11 @@
+# ============================================================================= 
+# © 2025 [SapkalRohini77@gmail.com]. All rights reserved. 
+# This code is shared for evaluation purposes only with [NorthBay] 
+# Unauthorized use, copying, or redistribution is prohibited.
+# =============================================================================    
+
+# benchmarks/__main__.py
+
+from benchmarks.harness import main
+
+main()
@@ -0,0 +1,68 @@
+# ============================================================================= 
+# © 2025 [SapkalRohini77@gmail.com]. All rights reserved. 
+# This code is shared for evaluation purposes only with [NorthBay] 
+# Unauthorized use, copying, or redistribution is prohibited.
+# =============================================================================    
+
+# benchmarks/e2e.py
+#
+# End-to-end benchmarks of login and _send_and_get_answer against the local stand-in
+# app, with fixed latency/streaming so the numbers reflect the harness, not the bot.
+
+import time
+from benchmarks.harness import summarize, failed
+from lib.utils.standin_server import StandinServer, StandinConfig
+from lib.utils.auth import login
+from lib.utils.chat import _send_and_get_answer
+from lib.utils.context_pool import context_options
+
+EMAIL, PASSWORD = "bench@example.com", "bench"
+KNOBS = ("latency_ms", "marker_ms", "chunk_chars", "chunk_ms")
+
+
+def _timed(fn) -> float:
+    t0 = time.perf_counter()
+    fn()
+    return (time.perf_counter() - t0) * 1e6
+
+def run(browser: str = "chromium", repeat: int = 3) -> list:
+    try:
+        from playwright.sync_api import sync_playwright
+    except ImportError as e:
+        return [failed("auth.login[standin]", e), failed("chat._send_and_get_answer[standin]", e)]
+
+    cfg = StandinConfig(latency_ms=100, marker_ms=50, chunk_chars=24, chunk_ms=10, seed=0)
+    prompt = next(iter(cfg.answers), "How do I renew my residence visa?")
+    server = StandinServer(cfg=cfg).start()
+    results = []
+    try:
+        with sync_playwright() as p:
+            b = getattr(p, browser).launch(headless=True)
+            try:
+                samples = []
+                for _ in range(repeat + 1):  # first run warms the browser, not counted
+                    ctx = b.new_context(**context_options("en-US", False))
+                    samples.append(_timed(lambda: login(ctx.new_page(), server.url, EMAIL, PASSWORD)))
+                    ctx.close()
+                results.append(summarize("auth.login[standin]", samples[1:]))
+
+                ctx = b.new_context(**context_options("en-US", False))
+                page = login(ctx.new_page(), server.url, EMAIL, PASSWORD)
+                samples, timings = [], []
+                for _ in range(repeat + 1):
+                    page.goto(server.url, wait_until="domcontentloaded")  # fresh conversation
+                    timing = {}
+                    samples.append(_timed(lambda: _send_and_get_answer(page, prompt, timing=timing)))
+                    timings.append(timing)
+                ctx.close()
+                results.append(summarize("chat._send_and_get_answer[standin]", samples[1:],
+                                         standin={k: getattr(cfg, k) for k in KNOBS},
+                                         timing=timings[-1]))
+            finally:
+                b.close()
+    except Exception as e:
+        done = {r["name"] for r in results}
+        results += [failed(n, e) for n in ("auth.login[standin]", "chat._send_and_get_answer[standin]") if n not in done]
+    finally:
+        server.stop()
+    return results
@@ -0,0 +1,169 @@
+# ============================================================================= 
+# © 2025 [SapkalRohini77@gmail.com]. All rights reserved. 
+# This code is shared for evaluation purposes only with [NorthBay] 
+# Unauthorized use, copying, or redistribution is prohibited.
+# =============================================================================    
+
+# benchmarks/harness.py
+#
+# Timing, environment metadata and result files for the harness benchmarks:
+#   python -m benchmarks run [--suite micro,e2e] [--scorer ngram] [--out reports/bench/<ts>.json]
+#   python -m benchmarks compare reports/bench/base.json reports/bench/new.json [--threshold 0.10]
+
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import statistics
+import subprocess
+from importlib import metadata
+
+PACKAGES = ("numpy", "torch", "sentence-transformers", "playwright", "pytest")
+
+
+def bench(name: str, fn, repeat: int = 7, min_sample_s: float = 0.02, number: int = None) -> dict:
+    """
+    Times fn() `repeat` times; each sample loops `number` calls (auto-sized so a sample
+    takes at least min_sample_s). Reports per-call microseconds.
+    """
+    fn()  # warm-up call, not timed
+    if number is None:
+        number = 1
+        while True:
+            t0 = time.perf_counter()
+            for _ in range(number):
+                fn()
+            if time.perf_counter() - t0 >= min_sample_s or number >= 1_000_000:
+                break
+            number *= 10
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for _ in range(number):
+            fn()
+        samples.append((time.perf_counter() - t0) / number * 1e6)
+    return summarize(name, samples, number=number)
+
+def summarize(name: str, samples_us: list, number: int = 1, **extra) -> dict:
+    return {
+        "name": name,
+        "unit": "us",
+        "median": round(statistics.median(samples_us), 3),
+        "min": round(min(samples_us), 3),
+        "mean": round(statistics.fmean(samples_us), 3),
+        "stdev": round(statistics.stdev(samples_us), 3) if len(samples_us) > 1 else 0.0,
+        "repeat": len(samples_us),
+        "number": number,
+        **extra,
+    }
+
+def failed(name: str, err: Exception) -> dict:
+    return {"name": name, "error": f"{type(err).__name__}: {str(err).strip().splitlines()[0] if str(err).strip() else err}"}
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              timeout=10).stdout.strip() or None
+    except Exception:
+        return None
+
+def _version(pkg: str):
+    try:
+        return metadata.version(pkg)
+    except metadata.PackageNotFoundError:
+        return None
+
+def environment(scorer: str) -> dict:
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "scorer": scorer,
+        "packages": {p: _version(p) for p in PACKAGES},
+    }
+
+
+def compare(base: dict, new: dict, threshold: float = 0.10) -> list:
+    """
+    Per benchmark present in both runs: ratio of medians and a verdict. A change only counts
+    when it is beyond `threshold` (relative) AND beyond twice the larger stdev of the two runs,
+    so ordinary run-to-run noise is not reported as a regression.
+    """
+    base_by = {r["name"]: r for r in base["results"] if "median" in r}
+    rows = []
+    for r in new["results"]:
+        b = base_by.get(r["name"])
+        if b is None or "median" not in r:
+            continue
+        delta = r["median"] - b["median"]
+        ratio = r["median"] / b["median"] if b["median"] else float("inf")
+        noise = 2 * max(b.get("stdev", 0.0), r.get("stdev", 0.0))
+        verdict = "ok"
+        if abs(delta) > noise and ratio > 1 + threshold:
+            verdict = "regression"
+        elif abs(delta) > noise and ratio < 1 - threshold:
+            verdict = "improvement"
+        rows.append({"name": r["name"], "base": b["median"], "new": r["median"], "ratio": round(ratio, 3),
+                     "verdict": verdict})
+    return rows
+
+
+def _print_results(results: list) -> None:
+    print(f"{'benchmark':<44} {'median_us':>12} {'min_us':>12} {'stdev':>10} {'n':>8}")
+    for r in results:
+        if "error" in r:
+            print(f"{r['name']:<44} skipped: {r['error']}")
+        else:
+            print(f"{r['name']:<44} {r['median']:>12} {r['min']:>12} {r['stdev']:>10} {r['number']:>8}")
+
+def _print_compare(rows: list) -> None:
+    print(f"{'benchmark':<44} {'base_us':>12} {'new_us':>12} {'ratio':>7}  verdict")
+    for r in rows:
+        print(f"{r['name']:<44} {r['base']:>12} {r['new']:>12} {r['ratio']:>7}  {r['verdict']}")
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="python -m benchmarks", description="Benchmarks for the harness hot paths")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    run = sub.add_parser("run", help="run the benchmarks and save a JSON result file")
+    run.add_argument("--suite", default="micro,e2e", help="comma separated: micro, e2e")
+    run.add_argument("--scorer", default=os.environ.get("SCORER_BACKEND", "st"), help="similarity backend for sim_* benchmarks")
+    run.add_argument("--repeat", type=int, default=7)
+    run.add_argument("--browser", default=os.environ.get("BROWSER", "chromium"))
+    run.add_argument("--out", default=None, help="default: reports/bench/bench_<timestamp>.json")
+    cmp_ = sub.add_parser("compare", help="compare two result files; exits 1 on regressions")
+    cmp_.add_argument("base")
+    cmp_.add_argument("new")
+    cmp_.add_argument("--threshold", type=float, default=0.10, help="relative change treated as noise (default 0.10)")
+    args = ap.parse_args(argv)
+
+    if args.cmd == "compare":
+        base = json.load(open(args.base, encoding="utf-8"))
+        new = json.load(open(args.new, encoding="utf-8"))
+        rows = compare(base, new, args.threshold)
+        _print_compare(rows)
+        regressions = [r for r in rows if r["verdict"] == "regression"]
+        if regressions:
+            print(f"{len(regressions)} regression(s) beyond {args.threshold:.0%}")
+            sys.exit(1)
+        return
+
+    from benchmarks import micro, e2e
+    suites = {"micro": lambda: micro.run(args.scorer, args.repeat),
+              "e2e": lambda: e2e.run(args.browser, max(3, args.repeat // 2))}
+    results = []
+    for name in [s.strip() for s in args.suite.split(",") if s.strip()]:
+        results += suites[name]()
+    report = {"environment": environment(args.scorer), "results": results}
+    out = args.out or os.path.join("reports", "bench", f"bench_{time.strftime('%Y%m%d_%H%M%S')}.json")
+    os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    _print_results(results)
+    print(f"Benchmark results: {out}")
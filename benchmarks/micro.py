@@ -0,0 +1,96 @@
+# ============================================================================= 
+# © 2025 [SapkalRohini77@gmail.com]. All rights reserved. 
+# This code is shared for evaluation purposes only with [NorthBay] 
+# Unauthorized use, copying, or redistribution is prohibited.
+# =============================================================================    
+
+# benchmarks/micro.py
+#
+# Micro-benchmarks of the text helpers and similarity scoring, on the golden answers.
+
+import os
+import sys
+import tempfile
+import subprocess
+from benchmarks.harness import bench, summarize, failed
+from lib.utils.common import normalize, _norm, _looks_clean, _links_are_gov_whitelisted
+from lib.utils.chat import _strip_sources
+from lib.utils.dataset import load
+
+# First similarity call in a fresh interpreter: import, model load and one encode
+_COLD_SNIPPET = """
+import time
+t0 = time.perf_counter()
+from lib.utils import semantics
+semantics.set_backend({scorer!r})
+semantics.{fn}({a!r}, {b!r})
+print((time.perf_counter() - t0) * 1e6)
+"""
+
+
+def _texts():
+    ds = load()
+    en = [p["golden"] for p in ds.iter_cases(ds.select(lang="en")) if p.get("golden")]
+    ar = [p["golden"] for p in ds.iter_cases(ds.select(lang="ar")) if p.get("golden")]
+    answer = ("\n".join(en) + "\n• Apply online\n– Pay the fees\n<b>Note</b> <br> see the portal"
+              + "\nSources\n1. ICP - https://icp.gov.ae/en/services\n2. GDRFA - https://gdrfad.gov.ae/en")
+    return en, ar, answer
+
+def _cold(fn: str, scorer: str, a: str, b: str, repeat: int) -> dict:
+    env = dict(os.environ, EMBED_CACHE="0")
+    env.pop("EMBED_SERVER_SOCKET", None)
+    code = _COLD_SNIPPET.format(scorer=scorer, fn=fn, a=a, b=b)
+    samples = []
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, env=env, timeout=600)
+        if out.returncode:
+            raise RuntimeError(out.stderr.strip().splitlines()[-1] if out.stderr.strip() else "cold run failed")
+        samples.append(float(out.stdout.strip().splitlines()[-1]))
+    return summarize(f"{fn}[{scorer},cold]", samples)
+
+def _similarity(scorer: str, en: list, ar: list, repeat: int) -> list:
+    from lib.utils import semantics
+    a_en, b_en = en[0], en[-1]
+    a_xl, b_xl = en[0], (ar or en)[0]
+    results = []
+    for fn, a, b in (("sim_en", a_en, b_en), ("sim_xl", a_xl, b_xl)):
+        try:
+            results.append(_cold(fn, scorer, a, b, max(3, repeat // 2)))
+        except Exception as e:
+            results.append(failed(f"{fn}[{scorer},cold]", e))
+
+    semantics.set_backend(scorer)
+    saved = {k: os.environ.get(k) for k in ("EMBED_CACHE", "EMBED_CACHE_DIR")}
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            # warm = model loaded; "nocache" encodes every call, "cached" reads the embedding store
+            for label, env in (("warm,nocache", {"EMBED_CACHE": "0"}), ("warm,cached", {"EMBED_CACHE": "1", "EMBED_CACHE_DIR": tmp})):
+                os.environ.update(env)
+                semantics.reset_cache()
+                for fn, a, b in (("sim_en", a_en, b_en), ("sim_xl", a_xl, b_xl)):
+                    try:
+                        results.append(bench(f"{fn}[{scorer},{label}]", lambda: getattr(semantics, fn)(a, b), repeat))
+                    except Exception as e:
+                        results.append(failed(f"{fn}[{scorer},{label}]", e))
+                    semantics.flush_cache()
+    finally:
+        for k, v in saved.items():
+            if v is None:
+                os.environ.pop(k, None)
+            else:
+                os.environ[k] = v
+        semantics.reset_cache()
+    return results
+
+def run(scorer: str = "st", repeat: int = 7) -> list:
+    en, ar, answer = _texts()
+    matcher = load().fact_matcher()
+    results = [
+        bench("common.normalize", lambda: normalize(answer), repeat),
+        bench("common._norm", lambda: _norm(answer), repeat),
+        bench("chat._strip_sources", lambda: _strip_sources(answer), repeat),
+        bench("common._looks_clean", lambda: _looks_clean(answer), repeat),
+        bench("common._links_are_gov_whitelisted", lambda: _links_are_gov_whitelisted(answer), repeat),
+        bench("facts.FactMatcher.find", lambda: matcher.find(answer), repeat),
+    ]
+    return results + _similarity(scorer, en, ar, repeat)
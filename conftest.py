@@ -5,11 +5,24 @@
 # =============================================================================    
 
 import os
+import sys
+import json
 import pytest
 from dotenv import load_dotenv
 from playwright.sync_api import sync_playwright
-from lib.utils.auth import login
-from lib.utils.reporting import attach_on_failure
+from lib.utils.auth import login, ensure_logged_in, storage_state_path, storage_state_is_fresh, save_storage_state
+from lib.utils.chat import UiChat
+from lib.utils.context_pool import ContextPool, context_options
+from lib.utils.locators import lookup_stats
+from lib.utils.api_client import ChatApiClient
+from lib.utils.async_runner import run_prompts, PrefetchedChat
+from lib.utils.cassette import AnswerCassette
+from lib.utils.standin_server import StandinServer
+from lib.utils.reporting import attach_on_failure, flush_artifacts
+from lib.utils.artifact_store import store as artifact_store, prune_loose_files, RUN_ID
+from lib.utils.prompt_timings import TimedChat, write_prometheus, run_records
+from lib.utils.perf_gate import Baseline, run_gate, write_allure_result, regression_lines, MODES as PERF_GATE_MODES
+from lib.utils.dataset import load as load_dataset, base_id
 
 
 # Helper functions to parse environment variables
@@ -22,21 +35,60 @@ def _env_str(name: str, default: str) -> str:
     return os.environ.get(name, default).strip()
 
 
-# ---- Add custom CLI options: --headed, --browser, --mobile ----
+# ---- Add custom CLI options: --headed, --browser, --mobile, --scorer, --scoring, --transport, --answers, --standin, --perf-gate, --data* ----
 def pytest_addoption(parser):
     parser.addoption("--headed", action="store_true", help="Run browser in headed mode")
     parser.addoption("--browser", choices=["chromium", "firefox", "webkit"], default=None, help="Select browser engine")
     parser.addoption("--mobile", action="store_true", help="Emulate a phone-sized viewport")
+    parser.addoption("--scorer", default=None, help="Similarity scorer backend: st, st-int8 or ngram")
+    parser.addoption("--scoring", choices=["whole", "sentence"], default=None,
+                     help="score answers as one text (whole) or by sentence alignment with the golden (sentence)")
+    parser.addoption("--transport", choices=["ui", "api", "async"], default=None, help="How GenAI suites reach the chatbot")
+    parser.addoption("--answers", choices=["live", "record", "replay"], default=None,
+                     help="record answers to / replay them from the JSONL cassette (ANSWERS_CASSETTE)")
+    parser.addoption("--standin", action="store_true", help="Run against the local stand-in U-Ask server (offline)")
+    parser.addoption("--perf-gate", choices=PERF_GATE_MODES, default=None,
+                     help="compare prompt latencies with the stored baseline (PERF_BASELINE): record, warn or fail")
+    parser.addoption("--data", default=None, help="golden dataset: a test-data.json file or a sharded dataset directory")
+    parser.addoption("--data-tags", default=None, help="only cases with any of these tags (comma separated)")
+    parser.addoption("--data-service", default=None, help="only cases of these services (comma separated)")
+    parser.addoption("--data-sample", type=int, default=None, help="stratified random sample of this many intents")
+
+
+# ---- Dataset selection: the suites read it at import time, i.e. before any fixture runs ----
+def pytest_configure(config):
+    load_dotenv(dotenv_path=os.path.join("config", ".env"))
+    for opt, env in (("--data", "TEST_DATA"), ("--data-tags", "DATA_TAGS"),
+                     ("--data-service", "DATA_SERVICE"), ("--data-sample", "DATA_SAMPLE")):
+        if config.getoption(opt) is not None:
+            os.environ[env] = str(config.getoption(opt))
+
+
+# ---- Local stand-in app (STANDIN_* env vars tune latency / chunking / failures) ----
+@pytest.fixture(scope="session")
+def standin_server():
+    server = StandinServer(port=int(_env_str("STANDIN_PORT", "0"))).start()
+    yield server
+    server.stop()
+
+
+def _perf_gate_mode(pytestconfig) -> str:
+    return pytestconfig.getoption("--perf-gate") or _env_str("PERF_GATE", "off")
 
 
 # ---- Load config from CLI or .env ----
 @pytest.fixture(scope="session")
-def config(pytestconfig):
+def config(pytestconfig, request):
     load_dotenv(dotenv_path=os.path.join("config", ".env"))
 
     cli_headed = pytestconfig.getoption("--headed")
     cli_browser = pytestconfig.getoption("--browser")
     cli_mobile = pytestconfig.getoption("--mobile")
+    cli_scorer = pytestconfig.getoption("--scorer")
+    cli_scoring = pytestconfig.getoption("--scoring")
+    cli_transport = pytestconfig.getoption("--transport")
+    cli_answers = pytestconfig.getoption("--answers")
+    cli_standin = pytestconfig.getoption("--standin")
 
     env_headless = _env_bool("HEADLESS", True)
     env_browser = _env_str("BROWSER", "chromium")
@@ -46,20 +98,44 @@ def config(pytestconfig):
     browser = cli_browser if cli_browser else env_browser
     mobile = True if cli_mobile else env_mobile
 
-    return {
+    cfg = {
         "base_url": _env_str("BASE_URL", "https://govgpt.sandbox.dge.gov.ae/"),
         "email": _env_str("EMAIL", ""),
         "password": _env_str("PASSWORD", ""),
         "lang": _env_str("LANG", "en"),
         "headless": headless,
         "browser": browser,
-        "mobile": mobile
+        "mobile": mobile,
+        "scorer": cli_scorer or _env_str("SCORER_BACKEND", "st"),
+        "scoring": cli_scoring or _env_str("SCORING_MODE", "whole"),
+        "transport": cli_transport or _env_str("TRANSPORT", "ui"),
+        "pool_size": int(_env_str("CONTEXT_POOL_SIZE", "2")),
+        "answers": cli_answers or _env_str("ANSWERS", "live"),
+        "perf_gate": _perf_gate_mode(pytestconfig)
     }
+    if cli_standin or _env_bool("STANDIN", False):
+        # the stand-in accepts any credentials unless started with --email/--password
+        cfg["base_url"] = request.getfixturevalue("standin_server").url
+        cfg["email"] = cfg["email"] or "standin@example.com"
+        cfg["password"] = cfg["password"] or "standin"
+    return cfg
+
+
+# ---- Warm up similarity models while the browser launches and logs in ----
+@pytest.fixture(scope="session", autouse=True)
+def semantic_models(config):
+    semantics = sys.modules.get("lib.utils.semantics")
+    if semantics:  # only when collected tests actually score answers
+        semantics.set_backend(config["scorer"])
+        semantics.set_scoring_mode(config["scoring"])
+        semantics.warm_up()
 
 
 # ---- Playwright browser fixture ----
 @pytest.fixture(scope="session")
 def browser(config):
+    if config["answers"] == "replay":
+        pytest.skip("needs a live browser; --answers=replay only serves recorded answers")
     with sync_playwright() as p:
         launcher = {
             "chromium": p.chromium,
@@ -71,22 +147,44 @@ def browser(config):
         b.close()
 
 
+# ---- Login once per worker, persisted as storage state ----
+@pytest.fixture(scope="session")
+def auth_state(browser, config):
+    path = storage_state_path()
+    if storage_state_is_fresh(path, int(_env_str("AUTH_STATE_TTL", "1800"))):
+        return path
+    ctx = browser.new_context()
+    try:
+        login(ctx.new_page(), config["base_url"], config["email"], config["password"])
+        return save_storage_state(ctx, path)
+    except Exception as e:
+        # logged_in_page retries the full login per test and reports the real error
+        print(f"[WARN] Could not create stored login state: {e}")
+        return None
+    finally:
+        ctx.close()
+
+
+# ---- Pre-warmed context pool (CONTEXT_POOL_SIZE=0 disables it) ----
+@pytest.fixture(scope="session")
+def context_pool(browser, config, auth_state):
+    pool = ContextPool(browser, config["base_url"], size=config["pool_size"], storage_state=auth_state)
+    yield pool
+    pool.close()
+
+
 # ---- Page context fixture ----
 @pytest.fixture()
-def page(browser, config):
-    if config["mobile"]:
-        viewport = {"width": 390, "height": 844}
-        ua = ("Mozilla/5.0 (iPhone; CPU iPhone OS 16_0 like Mac OS X) AppleWebKit/605.1.15 "
-              "(KHTML, like Gecko) Version/16.0 Mobile/15E148 Safari/604.1")
-    else:
-        viewport = {"width": 1280, "height": 800}
-        ua = None
+def page(request, browser, config, auth_state):
+    locale = "ar-AE" if config["lang"] == "ar" else "en-US"
+    if config["pool_size"] > 0:
+        pool = request.getfixturevalue("context_pool")
+        pg = pool.checkout(locale, config["mobile"])
+        yield pg
+        pool.checkin(pg, locale, config["mobile"])
+        return
 
-    ctx = browser.new_context(
-        locale="ar-AE" if config["lang"] == "ar" else "en-US",
-        viewport=viewport,
-        user_agent=ua
-    )
+    ctx = browser.new_context(**context_options(locale, config["mobile"]), storage_state=auth_state)
     pg = ctx.new_page()
     yield pg
     ctx.close()
@@ -94,8 +192,106 @@ def page(browser, config):
 
 # ---- Login fixture ----
 @pytest.fixture()
-def logged_in_page(page, config):
-    return login(page, config["base_url"], config["email"], config["password"])
+def logged_in_page(page, config, auth_state):
+    return ensure_logged_in(page, config["base_url"], config["email"], config["password"],
+                            state_path=auth_state or storage_state_path())
+
+
+# ---- Chat transport: browser page (ui), direct API client (api) or concurrent pages (async) ----
+@pytest.fixture(scope="session")
+def api_client(browser, config, auth_state):
+    if auth_state:
+        client = ChatApiClient.from_storage_state(auth_state, config["base_url"])
+    else:
+        client = ChatApiClient.from_login(browser, config["base_url"], config["email"], config["password"])
+    yield client
+    client.close()
+
+
+@pytest.fixture(scope="session")
+def prefetched_answers(config, auth_state):
+    if not auth_state:
+        pytest.fail("--transport=async needs a stored login state; check EMAIL/PASSWORD")
+    dataset = load_dataset()
+    cases = list({c["user"]: c for c in dataset.iter_cases(dataset.select())}.values())
+    return run_prompts(
+        cases, config["base_url"], auth_state,
+        concurrency=int(_env_str("ASYNC_CONCURRENCY", "4")),
+        browser=config["browser"], headless=config["headless"],
+        locale="ar-AE" if config["lang"] == "ar" else "en-US", mobile=config["mobile"]
+    )
+
+
+@pytest.fixture(scope="session")
+def answer_cassette_path():
+    return _env_str("ANSWERS_CASSETTE", os.path.join("data", "cassettes", "answers.jsonl"))
+
+
+@pytest.fixture(scope="session")
+def perf_baseline(config):
+    return Baseline() if config["perf_gate"] != "off" else None
+
+
+@pytest.fixture(scope="session")
+def primed_answers(request, config, answer_cassette_path):
+    """
+    Answers known before any test runs (--answers=replay, --transport=async) are embedded up
+    front, one batch per model, so the per-test golden and EN/AR scores are cache lookups.
+    """
+    if config["answers"] == "replay":
+        source = AnswerCassette(answer_cassette_path, "replay")
+    else:
+        source = PrefetchedChat(request.getfixturevalue("prefetched_answers"))
+    semantics = sys.modules.get("lib.utils.semantics")
+    if not semantics:  # nothing collected scores answers
+        return 0
+    dataset = load_dataset()
+    answers = {}
+    for c in dataset.iter_cases(dataset.select()):
+        try:
+            answers[source.ask(c["user"], lang=c["lang"])] = c["lang"]
+        except AssertionError:
+            continue  # not recorded / failed prompt: its test reports that
+    # EN answers: en model (EN goldens) and xl (EN/AR consistency); AR answers: xl only
+    return (semantics.prime([a for a, lang in answers.items() if lang == "en"], "en")
+            + semantics.prime(list(answers), "xl"))
+
+
+@pytest.fixture()
+def chat(request, config, answer_cassette_path, perf_baseline):
+    if config["answers"] == "replay":
+        request.getfixturevalue("primed_answers")
+        return AnswerCassette(answer_cassette_path, "replay")
+    if config["transport"] == "api":
+        transport = request.getfixturevalue("api_client")
+    elif config["transport"] == "async":
+        request.getfixturevalue("primed_answers")
+        transport = PrefetchedChat(request.getfixturevalue("prefetched_answers"))
+    else:
+        transport = UiChat(request.getfixturevalue("logged_in_page"))
+    if config["answers"] == "record":
+        transport = AnswerCassette(answer_cassette_path, "record", inner=transport)
+    return TimedChat(transport, config["transport"], baseline=perf_baseline)
+
+
+# ---- pytest-xdist: keep each intent (EN and AR variants) on one worker under --dist loadgroup ----
+def _case_ids(value, dataset):
+    if isinstance(value, str):
+        return [value] if value in dataset else []
+    if isinstance(value, dict):
+        return [value["id"]] if value.get("id") else []
+    if isinstance(value, (list, tuple)):
+        return [i for v in value for i in _case_ids(v, dataset)]
+    return []
+
+
+def pytest_collection_modifyitems(config, items):
+    dataset = load_dataset()
+    for item in items:
+        params = getattr(getattr(item, "callspec", None), "params", {})
+        bases = sorted({base_id(i) for v in params.values() for i in _case_ids(v, dataset)})
+        if bases:
+            item.add_marker(pytest.mark.xdist_group(name="intent-" + "+".join(bases)))
 
 
 # ---- Pytest hook: Capture failed test reporting ----
@@ -105,6 +301,77 @@ def pytest_runtest_makereport(item, call):
     result = outcome.get_result()
 
     if result.when == "call" and result.failed:
-        page = item.funcargs.get("logged_in_page") or item.funcargs.get("page")
+        page = (item.funcargs.get("logged_in_page") or item.funcargs.get("page")
+                or getattr(item.funcargs.get("chat"), "page", None))
         if page:
             attach_on_failure(item, page)
+
+
+# ---- Pytest hook: Artifact retention, once per run (not per xdist worker) ----
+def pytest_sessionstart(session):
+    if hasattr(session.config, "workerinput") or session.config.option.collectonly:
+        return
+    load_dotenv(dotenv_path=os.path.join("config", ".env"))
+    max_mb = _env_str("ARTIFACT_MAX_MB", "500")
+    max_age = _env_str("ARTIFACT_MAX_AGE_DAYS", "14")
+    keep = _env_str("ARTIFACT_KEEP_RUNS", "20")
+    try:
+        artifact_store().enforce_retention(
+            max_bytes=int(max_mb) * 1024 * 1024 if max_mb else None,
+            max_age_days=float(max_age) if max_age else None,
+            keep_runs=int(keep) if keep else None,
+        )
+        if max_age:
+            prune_loose_files(float(max_age))
+    except Exception as e:
+        print(f"[WARN] Artifact retention skipped: {e}")
+
+
+# ---- Pytest hook: Write out queued screenshots / DOM snapshots and the prompt timing textfile ----
+def pytest_sessionfinish(session, exitstatus):
+    flush_artifacts()
+    write_prometheus()
+    mode = _perf_gate_mode(session.config)
+    if mode == "off" or hasattr(session.config, "workerinput") or session.config.option.collectonly:
+        return
+    # the controller sees every worker's timings through the JSONL sink
+    report = run_gate(run_records(RUN_ID), RUN_ID, mode)
+    session.config._perf_gate_report = report
+    path = os.path.join("reports", "timings", f"perf_gate_{RUN_ID}.json")
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    alluredir = getattr(session.config.option, "allure_report_dir", None)
+    if alluredir:
+        write_allure_result(report, alluredir)
+    if report["failed"]:
+        session.exitstatus = pytest.ExitCode.TESTS_FAILED
+
+
+# ---- Pytest hook: Embedding cache savings, element lookup and artifact telemetry ----
+def pytest_terminal_summary(terminalreporter):
+    a = flush_artifacts()
+    if a["written"] or a["errors"] or artifact_store().stats()["deduped"]:
+        terminalreporter.write_line(
+            f"artifacts: written={a['written']} bytes={a['bytes']} errors={a['errors']} "
+            f"deduplicated={artifact_store().stats()['deduped']}"
+        )
+    for target, st in lookup_stats().items():
+        terminalreporter.write_line(
+            f"lookup {target}: n={st['count']} total={st['total_ms']:.0f}ms max={st['max_ms']:.0f}ms "
+            f"cached={st['cached']} not_found={st['not_found']}"
+        )
+    report = getattr(terminalreporter.config, "_perf_gate_report", None)
+    if report:
+        for line in regression_lines(report):
+            terminalreporter.write_line(f"perf regression {line}")
+        terminalreporter.write_line(
+            f"perf gate ({report['mode']}): {len(report['regressions'])} regression(s) beyond "
+            f"{report['tolerance']:.0%}, {sum(r['verdict'] == 'no_baseline' for r in report['rows'])} intent(s) without baseline"
+        )
+    semantics = sys.modules.get("lib.utils.semantics")
+    s = semantics.cache_stats() if semantics else None
+    if s and (s["hits"] or s["misses"]):
+        terminalreporter.write_line(
+            f"embedding cache: hits={s['hits']} misses={s['misses']} hit_rate={s['hit_rate']:.0%}"
+        )
@@ -0,0 +1,130 @@
+# ============================================================================= 
+# © 2025 [SapkalRohini77@gmail.com]. All rights reserved. 
+# This code is shared for evaluation purposes only with [NorthBay] 
+# Unauthorized use, copying, or redistribution is prohibited.
+# =============================================================================    
+
+# lib/utils/api_client.py
+
+import os
+import re
+import json
+import time
+import allure
+import requests
+from urllib.parse import urljoin
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from lib.utils.auth import login
+from lib.utils.chat import parse_chat_payload, _strip_sources
+
+
+def _charset(content_type: str) -> str:
+    """
+    The charset the Content-Type declares, else utf-8 (requests would assume ISO-8859-1
+    for text/event-stream and turn Arabic answers into mojibake).
+    """
+    m = re.search(r'charset\s*=\s*"?([\w.:-]+)', content_type or "", flags=re.I)
+    return m.group(1) if m else "utf-8"
+
+
+class ChatApiClient:
+    """
+    Browserless chat transport: posts prompts straight to the chat API with the
+    cookies of a browser login and returns the answer text, like _send_and_get_answer.
+    """
+
+    def __init__(self, base_url: str, cookies=None, api_path: str = None, pool_size: int = 8, timeout: int = 120,
+                 retries: int = 2):
+        self.url = urljoin(base_url, api_path or os.environ.get("CHAT_API_PATH", "/api/chat"))
+        self.prompt_field = os.environ.get("CHAT_API_PROMPT_FIELD", "message")
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self.page = None  # no browser page to screenshot on failure
+        self.last_timing = {}
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=pool_size, pool_maxsize=pool_size,
+            # connect errors only: a chat POST that reached the bot is never sent twice
+            max_retries=Retry(total=retries, connect=retries, read=0, status=0, other=0, backoff_factor=0.5),
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        for c in cookies or []:
+            self.session.cookies.set(c["name"], c["value"], domain=c.get("domain"), path=c.get("path", "/"))
+
+    @classmethod
+    def from_login(cls, browser, base_url: str, email: str, password: str, **kwargs):
+        """
+        Logs in once through the browser and keeps only the resulting auth cookies.
+        """
+        ctx = browser.new_context()
+        try:
+            page = ctx.new_page()
+            login(page, base_url, email, password)
+            cookies = ctx.cookies()
+        finally:
+            ctx.close()
+        return cls(base_url, cookies=cookies, **kwargs)
+
+    @classmethod
+    def from_storage_state(cls, path: str, base_url: str, **kwargs):
+        """
+        Reuses the cookies of a saved Playwright storage state (see auth.storage_state_path).
+        """
+        with open(path, encoding="utf-8") as f:
+            cookies = json.load(f).get("cookies", [])
+        return cls(base_url, cookies=cookies, **kwargs)
+
+    def _post(self, prompt: str):
+        t0 = time.perf_counter(); first = None; parts = []
+        with self.session.post(self.url, json={self.prompt_field: prompt}, stream=True, timeout=self.timeout) as r:
+            r.raise_for_status()
+            # first byte on its own read: chunk_size=None may only return once the whole
+            # body is in when the stream is not chunk-framed
+            head = next(r.iter_content(chunk_size=1), b"")
+            if head:
+                first = time.perf_counter()
+                parts.append(head)
+                parts.extend(r.iter_content(chunk_size=None))
+            encoding = _charset(r.headers.get("Content-Type"))
+        end = time.perf_counter()
+        answer, sources = parse_chat_payload(b"".join(parts).decode(encoding, errors="replace"))
+        timing = {
+            "mode": "api",
+            "status": r.status_code,
+            "ttfc_ms": round((first - t0) * 1000) if first else None,
+            "stream_ms": round((end - first) * 1000) if first else None,
+            "total_ms": round((end - t0) * 1000),
+            "sources": len(sources),
+        }
+        if not answer:
+            raise AssertionError(f"Chat API response from {self.url} had no answer text (status {r.status_code})")
+        return answer, sources, timing
+
+    def send_and_get_answer(self, prompt: str, timing: dict = None) -> str:
+        answer, _, t = self._post(prompt)
+        if timing is not None:
+            timing.update(t)
+        return _strip_sources(answer)
+
+    def ask(self, prompt: str, intent: str = None, lang: str = None, raw: bool = False) -> str:
+        """
+        raw=True keeps the sources, appended under a "Sources" heading as the UI renders them.
+        """
+        answer, sources, self.last_timing = self._post(prompt)
+        allure.attach(json.dumps(self.last_timing), "api_timing", allure.attachment_type.JSON)
+        if raw:
+            return answer + ("\nSources\n" + "\n".join(sources) if sources else "")
+        return _strip_sources(answer)
+
+    def ask_many(self, prompts, max_workers: int = None) -> list:
+        """
+        Sends prompts concurrently over the pooled session; answers come back in input order.
+        """
+        with ThreadPoolExecutor(max_workers=max_workers or self.pool_size) as ex:
+            return list(ex.map(lambda p: _strip_sources(self._post(p)[0]), prompts))
+
+    def close(self):
+        self.session.close()
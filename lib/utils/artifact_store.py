@@ -0,0 +1,167 @@
+# ============================================================================= 
+# © 2025 [SapkalRohini77@gmail.com]. All rights reserved. 
+# This code is shared for evaluation purposes only with [NorthBay] 
+# Unauthorized use, copying, or redistribution is prohibited.
+# =============================================================================    
+
+# lib/utils/artifact_store.py
+#
+# Content-addressed store for failure artifacts and answer texts:
+#   reports/store/objects/<sha[:2]>/<sha256>.<ext>   one file per distinct content
+#   reports/store/runs/<run_id>.jsonl                 which test referenced what, per run
+# Identical screenshots / DOM snapshots / answers are kept once across tests and runs;
+# enforce_retention() (run at session start) trims old runs and unreferenced objects.
+
+import os
+import json
+import time
+import glob
+import uuid
+import hashlib
+import subprocess
+import threading
+from functools import lru_cache
+
+DEFAULT_ROOT = os.path.join("reports", "store")
+# Shared by all xdist workers of one run; a plain run gets its own id
+RUN_ID = (os.environ.get("ARTIFACT_RUN_ID") or os.environ.get("PYTEST_XDIST_TESTRUNUID")
+          or f"{time.strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}")
+os.environ.setdefault("ARTIFACT_RUN_ID", RUN_ID)  # inherited by xdist workers started from here
+# What prune_loose_files may delete: the pre-store timestamped failure artifacts and allure results
+LOOSE_FILES = (
+    os.path.join("reports", "FAILED_*.png"),
+    os.path.join("reports", "DOM_*.html"),
+    os.path.join("reports", "allure-results", "*"),
+)
+
+
+class ArtifactStore:
+    def __init__(self, root: str = None, run_id: str = None):
+        self.root = root or os.environ.get("ARTIFACT_STORE_DIR", DEFAULT_ROOT)
+        self.run_id = run_id or RUN_ID
+        self.objects = os.path.join(self.root, "objects")
+        self.runs = os.path.join(self.root, "runs")
+        self._claimed = set()
+        self._lock = threading.Lock()
+        self.stored = 0
+        self.deduped = 0
+
+    def object_path(self, sha: str, ext: str) -> str:
+        return os.path.join(self.objects, sha[:2], f"{sha}.{ext}")
+
+    def put(self, data: bytes, name: str, ext: str, test: str = None):
+        """
+        Records a reference to `data` in this run's manifest.
+        Returns (sha256, object path, is_new); the caller writes the object only when is_new.
+        """
+        sha = hashlib.sha256(data).hexdigest()
+        path = self.object_path(sha, ext)
+        with self._lock:
+            is_new = path not in self._claimed and not os.path.exists(path)
+            self._claimed.add(path)
+            if is_new:
+                self.stored += 1
+            else:
+                self.deduped += 1
+        rec = {"name": name, "sha256": sha, "ext": ext, "bytes": len(data), "test": test,
+               "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z")}
+        os.makedirs(self.runs, exist_ok=True)
+        # one write per record so appends from parallel workers do not interleave
+        with open(os.path.join(self.runs, f"{self.run_id}.jsonl"), "a", encoding="utf-8") as f:
+            f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+        return sha, path, is_new
+
+    def stats(self) -> dict:
+        return {"stored": self.stored, "deduped": self.deduped}
+
+    # ---- Retention ----
+    def _manifests(self) -> list:
+        if not os.path.isdir(self.runs):
+            return []
+        paths = [os.path.join(self.runs, n) for n in os.listdir(self.runs) if n.endswith(".jsonl")]
+        return sorted(paths, key=os.path.getmtime, reverse=True)  # newest first
+
+    def _referenced(self, manifests: list) -> set:
+        refs = set()
+        for m in manifests:
+            with open(m, encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        rec = json.loads(line)
+                        refs.add(self.object_path(rec["sha256"], rec["ext"]))
+        return refs
+
+    def _objects(self) -> list:
+        out = []
+        for d, _, files in os.walk(self.objects):
+            out += [os.path.join(d, n) for n in files]
+        return out
+
+    def enforce_retention(self, max_bytes: int = None, max_age_days: float = None, keep_runs: int = None) -> dict:
+        """
+        Drops run manifests beyond the newest keep_runs or older than max_age_days, then deletes
+        objects no remaining run references. While the store is still over max_bytes the oldest
+        remaining runs are dropped too. The current run is never dropped.
+        """
+        manifests = self._manifests()
+        now = time.time()
+        keep = []
+        for i, m in enumerate(manifests):
+            current = os.path.basename(m) == f"{self.run_id}.jsonl"
+            too_many = keep_runs is not None and i >= keep_runs
+            too_old = max_age_days is not None and now - os.path.getmtime(m) > max_age_days * 86400
+            if current or not (too_many or too_old):
+                keep.append(m)
+        dropped = [m for m in manifests if m not in keep]
+        removed = self._gc(keep)
+        if max_bytes is not None:
+            while self._size() > max_bytes and len(keep) > 1 and \
+                    os.path.basename(keep[-1]) != f"{self.run_id}.jsonl":
+                dropped.append(keep.pop())  # oldest remaining run
+                removed += self._gc(keep)
+        for m in dropped:
+            os.remove(m)
+        return {"runs_dropped": len(dropped), "objects_removed": removed, "bytes": self._size()}
+
+    def _gc(self, keep: list) -> int:
+        refs = self._referenced(keep)
+        removed = 0
+        for obj in self._objects():
+            if obj not in refs and obj not in self._claimed:
+                os.remove(obj)
+                removed += 1
+        return removed
+
+    def _size(self) -> int:
+        return sum(os.path.getsize(o) for o in self._objects())
+
+
+def _git_tracked(paths) -> set:
+    try:
+        out = subprocess.run(["git", "ls-files", "-z", "--", *paths], capture_output=True, timeout=30).stdout
+    except (OSError, subprocess.SubprocessError):
+        return set()
+    return {os.path.normpath(p) for p in out.decode("utf-8", "replace").split("\0") if p}
+
+
+def prune_loose_files(max_age_days: float, patterns=LOOSE_FILES) -> int:
+    """
+    Deletes files matching patterns (legacy failure artifacts, old allure results) older than
+    max_age_days. Files under version control are never touched.
+    """
+    cutoff = time.time() - max_age_days * 86400
+    old = [p for pat in patterns for p in glob.glob(pat) if os.path.isfile(p) and os.path.getmtime(p) < cutoff]
+    if not old:
+        return 0
+    tracked = _git_tracked(old)
+    removed = 0
+    for p in old:
+        if os.path.normpath(p) not in tracked:
+            os.remove(p)
+            removed += 1
+    return removed
+
+
+@lru_cache(maxsize=1)
+def store() -> ArtifactStore:
+    return ArtifactStore()
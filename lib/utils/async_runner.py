@@ -0,0 +1,115 @@
+# ============================================================================= 
+# © 2025 [SapkalRohini77@gmail.com]. All rights reserved. 
+# This code is shared for evaluation purposes only with [NorthBay] 
+# Unauthorized use, copying, or redistribution is prohibited.
+# =============================================================================    
+
+# lib/utils/async_runner.py
+#
+# Sends many prompts concurrently from N pages of one authenticated context, so a
+# worker is not idle while the chatbot spends 10-60 s generating each answer.
+
+import time
+import asyncio
+import threading
+from playwright.async_api import async_playwright, TimeoutError as PWTimeout
+from lib.utils.chat import LOADING_MARKERS, QUIET_MS, _OBSERVER_JS, _SETTLED_JS, _RESPONSE_SEL, _strip_sources
+from lib.utils.context_pool import context_options
+from lib.utils.locators import TARGETS
+
+
+async def _ask(page, base_url: str, prompt: str, timeout_ms: int) -> dict:
+    timing = {}
+    await page.goto(base_url, wait_until="domcontentloaded")  # fresh conversation per prompt
+    ed = page.locator(TARGETS["composer"][0]).first
+    await ed.wait_for(state="visible", timeout=20000)
+    await ed.click()
+    await ed.fill(prompt)
+    await page.evaluate(_OBSERVER_JS)
+    # answers already on the page (none after the fresh goto, but never assume it)
+    base = await page.evaluate("sel => document.querySelectorAll(sel).length", _RESPONSE_SEL)
+    t0 = time.perf_counter()
+    await page.locator(TARGETS["send_button"][0]).first.click()
+    await page.locator(_RESPONSE_SEL).nth(base).wait_for(state="visible", timeout=45000)
+    timing["container_visible_ms"] = round((time.perf_counter() - t0) * 1000)
+    handle = await page.wait_for_function(
+        _SETTLED_JS,
+        arg={"sel": _RESPONSE_SEL, "markers": LOADING_MARKERS, "quietMs": QUIET_MS, "minLen": 20, "base": base},
+        timeout=timeout_ms
+    )
+    res = await handle.json_value()
+    timing["total_ms"] = round((time.perf_counter() - t0) * 1000)
+    timing["detect_ms"] = round(res["quietFor"])
+    return {"raw": res["text"], "answer": _strip_sources(res["text"]), "timing": timing}
+
+async def _run(cases, base_url, storage_state, concurrency, browser_name, headless, locale, mobile, timeout_ms):
+    async with async_playwright() as p:
+        browser = await getattr(p, browser_name).launch(headless=headless)
+        ctx = await browser.new_context(**context_options(locale, mobile), storage_state=storage_state)
+        pages = asyncio.Queue()
+        for _ in range(max(1, min(concurrency, len(cases)))):
+            pages.put_nowait(await ctx.new_page())
+
+        async def one(case):
+            page = await pages.get()
+            out = {"id": case.get("id"), "lang": case.get("lang"), "prompt": case["user"], "error": None}
+            try:
+                out.update(await _ask(page, base_url, case["user"], timeout_ms))
+            except PWTimeout as e:
+                out["error"] = f"Timed out waiting for final response: {e}"
+            except Exception as e:
+                out["error"] = f"{type(e).__name__}: {e}"
+            finally:
+                pages.put_nowait(page)
+            return out
+
+        try:
+            return await asyncio.gather(*(one(c) for c in cases))
+        finally:
+            await ctx.close()
+            await browser.close()
+
+def run_prompts(cases, base_url: str, storage_state: str, concurrency: int = 4, browser: str = "chromium",
+                headless: bool = True, locale: str = "en-US", mobile: bool = False, timeout_ms: int = 120000) -> list:
+    """
+    Fans the cases' prompts out over `concurrency` pages and returns one result per case:
+    {"id", "lang", "prompt", "answer", "raw", "timing", "error"}.
+    Runs its own event loop on a separate thread, so it is safe to call while the
+    sync Playwright fixtures are active.
+    """
+    result = {}
+
+    def target():
+        try:
+            result["value"] = asyncio.run(_run(list(cases), base_url, storage_state, concurrency,
+                                               browser, headless, locale, mobile, timeout_ms))
+        except BaseException as e:
+            result["error"] = e
+
+    t = threading.Thread(target=target, name="async-prompt-runner")
+    t.start()
+    t.join()
+    if "error" in result:
+        raise result["error"]
+    return result["value"]
+
+
+class PrefetchedChat:
+    """
+    Chat transport over answers gathered up front by run_prompts (--transport=async).
+    """
+
+    def __init__(self, results: list):
+        self.page = None
+        self.url = "async-runner"
+        self.last_timing = {}
+        self._by_prompt = {r["prompt"]: r for r in results}
+
+    def ask(self, prompt: str, intent: str = None, lang: str = None, raw: bool = False) -> str:
+        r = self._by_prompt.get(prompt)
+        if r is None:
+            raise AssertionError(f"Prompt was not part of the concurrent run: {prompt!r}")
+        if r["error"]:
+            raise AssertionError(f"[{r['id']}] {r['error']}")
+        self.last_timing = dict(r["timing"], mode="async")
+        return r["raw"] if raw else r["answer"]
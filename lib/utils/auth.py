@@ -4,87 +4,40 @@
 # Unauthorized use, copying, or redistribution is prohibited.
 # =============================================================================    
 
-from playwright.sync_api import Page, expect, TimeoutError as PWTimeout
+import os
+import time
+from playwright.sync_api import Page, expect
+from lib.utils.locators import find, find_any, resolve
 
 def _click_login_using_credentials(page: Page, timeout: int = 8000) -> None:
-    btn = page.locator("//button[normalize-space(.)='Login using Credentials']").first
     try:
-        if btn.count():
-            expect(btn).to_be_visible(timeout=timeout)
-            btn.scroll_into_view_if_needed()
-            btn.click()
-            return
-    except PWTimeout:
-        pass
+        # returns as soon as the page shows it is already past this step
+        name, _, btn = find_any(page, ("login_credentials", "email", "composer"), timeout=timeout)
+    except AssertionError:
+        return
+    if name != "login_credentials":
+        return  # already on the credentials form (or logged in)
+    btn.scroll_into_view_if_needed()
+    try:
+        btn.click()
     except Exception:
-        try:
-            if btn.count():
-                btn.scroll_into_view_if_needed()
-                btn.click(force=True)
-                return
-        except Exception:
-            pass
-    for frame in page.frames:
-        try:
-            fbtn = frame.locator("//button[normalize-space(.)='Login using Credentials']").first
-            if fbtn.count():
-                expect(fbtn).to_be_visible(timeout=timeout)
-                fbtn.scroll_into_view_if_needed()
-                fbtn.click()
-                return
-        except Exception:
-            continue
+        btn.click(force=True)
 
 def _fill_credentials_and_submit(page: Page, email: str, password: str, timeout: int = 15000) -> None:
-    filled = False
     try:
-        e = page.locator("#email").first
-        p = page.locator("#password").first
-        if e.count() and p.count():
-            expect(e).to_be_visible(timeout=timeout)
-            e.fill(email)
-            expect(p).to_be_visible()
-            p.fill(password)
-            s = page.locator("//button[@type='submit' and normalize-space()='Sign in']").first
-            expect(s).to_be_enabled()
-            s.click()
-            filled = True
-    except Exception:
-        pass
-    if not filled:
-        for f in page.frames:
-            try:
-                e = f.locator("#email").first
-                p = f.locator("#password").first
-                if e.count() and p.count():
-                    expect(e).to_be_visible(timeout=timeout)
-                    e.fill(email)
-                    expect(p).to_be_visible()
-                    p.fill(password)
-                    s = f.locator("//button[@type='submit' and normalize-space()='Sign in']").first
-                    expect(s).to_be_enabled()
-                    s.click()
-                    filled = True
-                    break
-            except Exception:
-                continue
-    if not filled:
+        frame, e = find(page, "email", timeout=timeout)
+        # password and submit must come from the same frame as the email field
+        p = resolve(frame, "password", timeout=5000)
+    except AssertionError:
         raise AssertionError("Login form not found: #email/#password/Sign in")
+    e.fill(email)
+    p.fill(password)
+    s = resolve(frame, "sign_in", timeout=5000)
+    expect(s).to_be_enabled()
+    s.click()
 
 def _wait_chat_composer(page: Page, timeout: int = 20000) -> None:
-    composer = page.locator("//div[@id='chat-input']//p").first
-    try:
-        expect(composer).to_be_visible(timeout=timeout)
-    except Exception:
-        for f in page.frames:
-            try:
-                c = f.locator("//div[@id='chat-input']//p").first
-                if c.count():
-                    expect(c).to_be_visible(timeout=timeout)
-                    return
-            except Exception:
-                continue
-        raise
+    resolve(page, "composer", timeout=timeout)
 
 def login(page: Page, base_url: str, email: str, password: str) -> Page:
     page.goto(base_url, wait_until="domcontentloaded")
@@ -100,3 +53,40 @@ def login(page: Page, base_url: str, email: str, password: str) -> Page:
         pass
     _wait_chat_composer(page)
     return page
+
+# ---- Persisted login (storage state) ----
+def storage_state_path(worker: str = None) -> str:
+    """
+    One storage-state file per pytest-xdist worker (or "main" without xdist).
+    """
+    worker = worker or os.environ.get("PYTEST_XDIST_WORKER", "main")
+    return os.path.join(".auth", f"state_{worker}.json")
+
+def storage_state_is_fresh(path: str, ttl_s: int) -> bool:
+    return bool(path) and os.path.exists(path) and (time.time() - os.path.getmtime(path)) < ttl_s
+
+def save_storage_state(context, path: str) -> str:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    context.storage_state(path=path)
+    return path
+
+def _session_is_valid(page: Page, timeout: int = 10000) -> bool:
+    # Whichever shows up first, in any frame: the chat composer (still logged in) or the login button (rejected)
+    try:
+        return find_any(page, ("composer", "login_credentials"), timeout=timeout)[0] == "composer"
+    except AssertionError:
+        return False
+
+def ensure_logged_in(page: Page, base_url: str, email: str, password: str, state_path: str = None) -> Page:
+    """
+    Opens the app with the session restored from storage state and only runs the full
+    login when the session is rejected, refreshing the saved state afterwards.
+    """
+    if not page.url.startswith(base_url):  # pooled pages are already on the app
+        page.goto(base_url, wait_until="domcontentloaded")
+    if _session_is_valid(page):
+        return page
+    login(page, base_url, email, password)
+    if state_path:
+        save_storage_state(page.context, state_path)
+    return page
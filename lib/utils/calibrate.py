@@ -0,0 +1,107 @@
+# ============================================================================= 
+# © 2025 [SapkalRohini77@gmail.com]. All rights reserved. 
+# This code is shared for evaluation purposes only with [NorthBay] 
+# Unauthorized use, copying, or redistribution is prohibited.
+# =============================================================================    
+
+# lib/utils/calibrate.py
+#
+# Compares scorer backends on data/test-data.json:
+#   python -m lib.utils.calibrate [--backends st,st-int8,ngram] [--out reports/calibration.json]
+
+import os
+import json
+import time
+import argparse
+from lib.utils import semantics
+from lib.utils.dataset import load, base_id
+
+
+def _pairs(data_path: str):
+    """
+    Positive pairs (same intent) and negative pairs (different intents), with the lang to score them in.
+    """
+    ds = load(data_path)
+    ids = ds.select()
+    goldens = [p for p in ds.iter_cases(ids) if p.get("golden")]
+    by_id = {p["id"]: p for p in goldens}
+
+    positives, negatives = [], []
+    for p in goldens:
+        positives.append((f"prompt↔golden::{p['id']}", p["user"], p["golden"], p.get("lang", "en")))
+    for en_id, ar_id in ds.pair_ids(ids):
+        if en_id in by_id and ar_id in by_id:
+            positives.append((f"en↔ar::{base_id(en_id)}", by_id[en_id]["golden"], by_id[ar_id]["golden"], "xl"))
+    for i, a in enumerate(goldens):
+        for b in goldens[i + 1:]:
+            if a.get("lang") == b.get("lang") and base_id(a["id"]) != base_id(b["id"]):
+                negatives.append((f"{a['id']}≠{b['id']}", a["golden"], b["golden"], a.get("lang", "en")))
+    return positives, negatives
+
+def _score_all(pairs):
+    scores = {}
+    for lang in sorted({p[3] for p in pairs}):
+        subset = [p for p in pairs if p[3] == lang]
+        for (name, *_), s in zip(subset, semantics.sim_many([(a, b) for _, a, b, _ in subset], lang=lang)):
+            scores[name] = round(s, 4)
+    return scores
+
+def calibrate(backends, data_path: str = "data/test-data.json") -> dict:
+    positives, negatives = _pairs(data_path)
+    os.environ["EMBED_CACHE"] = "0"  # measure the encoders, not the cache
+    report = {"data": data_path, "backends": {}}
+    for name in backends:
+        semantics.set_backend(name)
+        try:
+            t0 = time.perf_counter()
+            semantics._model(semantics.MODEL_EN); semantics._model(semantics.MODEL_XL)
+            load_s = time.perf_counter() - t0
+        except Exception as e:
+            report["backends"][name] = {"error": f"{type(e).__name__}: {e}"}
+            continue
+        t0 = time.perf_counter()
+        pos = _score_all(positives)
+        neg = _score_all(negatives)
+        score_s = time.perf_counter() - t0
+        n_pairs = len(positives) + len(negatives)
+        lo_pos = min(pos.values()) if pos else None
+        hi_neg = max(neg.values()) if neg else None
+        report["backends"][name] = {
+            "load_s": round(load_s, 3),
+            "ms_per_pair": round(1000 * score_s / max(1, n_pairs), 2),
+            "positive_mean": round(sum(pos.values()) / max(1, len(pos)), 4),
+            "negative_mean": round(sum(neg.values()) / max(1, len(neg)), 4),
+            "margin": round(lo_pos - hi_neg, 4) if pos and neg else None,
+            # threshold that separates this data set, if it is separable
+            "suggested_threshold": round((lo_pos + hi_neg) / 2, 3) if pos and neg else None,
+            "positives": pos,
+            "negatives": neg,
+        }
+    return report
+
+def _print_table(report: dict) -> None:
+    print(f"{'backend':<10} {'load_s':>8} {'ms/pair':>9} {'pos_mean':>9} {'neg_mean':>9} {'margin':>8} {'thr':>6}")
+    for name, r in report["backends"].items():
+        if "error" in r:
+            print(f"{name:<10} unavailable: {r['error']}")
+            continue
+        print(f"{name:<10} {r['load_s']:>8} {r['ms_per_pair']:>9} {r['positive_mean']:>9} "
+              f"{r['negative_mean']:>9} {str(r['margin']):>8} {str(r['suggested_threshold']):>6}")
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Compare similarity scorer backends on the golden data set")
+    ap.add_argument("--backends", default=",".join(semantics.BACKENDS))
+    ap.add_argument("--data", default="data/test-data.json")
+    ap.add_argument("--out", default=os.path.join("reports", f"calibration_{time.strftime('%Y%m%d_%H%M%S')}.json"))
+    args = ap.parse_args(argv)
+
+    report = calibrate([b.strip() for b in args.backends.split(",") if b.strip()], args.data)
+    _print_table(report)
+    os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"Calibration report: {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,9 +6,13 @@
 
 # lib/utils/chat.py
 
-from playwright.sync_api import expect
+from playwright.sync_api import expect, TimeoutError as PWTimeout, Error as PWError
+import os
+import re
+import json
 import time
 import allure
+from lib.utils.locators import find, resolve, css
 
 LOADING_MARKERS = ["Just a sec","Scanning the Gov Knowledge Base","Retrieving the right documents","Analyzing documents","⏳","📂","📄","🧠"]
 
@@ -20,35 +24,272 @@ def _strip_sources(txt:str)->str:
     return txt
 
 def _type_and_send(page, text: str):
-    ed = page.locator("//div[@id='chat-input']//p").first
-    expect(ed).to_be_visible(timeout=15000)
+    frame, ed = find(page, "composer", timeout=15000)
     ed.click()
     try:
         ed.fill(text)
     except Exception:
         page.keyboard.type(text)
-    send_btn = page.locator("//button[@type='submit']").first
+    send_btn = resolve(frame, "send_button", timeout=5000, state="attached")
     expect(send_btn).to_be_enabled()
+    _mark_send(page)
+    _start_timeline(page)
     send_btn.click()
 
-def _wait_for_final_response(page, timeout_ms: int = 120000) -> str:
-    container = page.locator("(//div[@id='response-content-container'])[last()]")
-    container.wait_for(state="visible", timeout=45000)
-    start = time.time(); last_txt=""; stable=0
+# Answers already on the page when a prompt is sent; only a container beyond these is this
+# prompt's answer (on the 2nd+ prompt the last container is the previous answer until then)
+_RESPONSE_SEL = css("response")
+
+def _mark_send(page) -> None:
+    try:
+        page.evaluate("sel => { window.__uaskSendBase = document.querySelectorAll(sel).length; }", _RESPONSE_SEL)
+    except Exception:
+        pass
+
+def _send_base(page) -> int:
+    try:
+        return int(page.evaluate("() => window.__uaskSendBase || 0"))
+    except Exception:
+        return 0
+
+# ---- Per-prompt timeline ----
+# A second MutationObserver, installed right before the send click, timestamps when the
+# new response container appears, the first loading marker, the first real answer text
+# and the last change of that text. Offsets are ms after the send click.
+_TIMELINE_JS = """({markers, sel}) => {
+  const t = {send: performance.now(), sendEpoch: Date.now(), base: document.querySelectorAll(sel).length,
+             container: null, firstMarker: null, firstContent: null, lastChange: null, lastText: ''};
+  if (window.__uaskTimelineObs) { window.__uaskTimelineObs.disconnect(); }
+  t.check = () => {
+    const all = document.querySelectorAll(sel);
+    if (all.length <= t.base) { return; }
+    const now = performance.now();
+    if (t.container === null) { t.container = now; }
+    const txt = (all[all.length - 1].innerText || '').trim();
+    if (!txt) { return; }
+    if (markers.some(m => txt.includes(m))) {
+      if (t.firstMarker === null) { t.firstMarker = now; }
+      return;
+    }
+    if (t.firstContent === null) { t.firstContent = now; }
+    if (txt !== t.lastText) { t.lastText = txt; t.lastChange = now; }
+  };
+  window.__uaskTimeline = t;
+  window.__uaskTimelineObs = new MutationObserver(t.check);
+  window.__uaskTimelineObs.observe(document.body, {childList: true, subtree: true, characterData: true});
+}"""
+
+_READ_TIMELINE_JS = """() => {
+  const t = window.__uaskTimeline;
+  if (!t) { return null; }
+  t.check();
+  window.__uaskTimelineObs.disconnect();
+  const rel = v => v === null ? null : Math.round(v - t.send);
+  return {send_epoch_ms: t.sendEpoch, container_visible_ms: rel(t.container), first_marker_ms: rel(t.firstMarker),
+          first_content_ms: rel(t.firstContent), final_stable_ms: rel(t.lastChange), detected_ms: rel(performance.now())};
+}"""
+
+def _start_timeline(page) -> None:
+    try:
+        page.evaluate(_TIMELINE_JS, {"markers": LOADING_MARKERS, "sel": _RESPONSE_SEL})
+    except Exception:  # instrumentation must never block a send
+        pass
+
+def _read_timeline(page) -> dict:
+    try:
+        return page.evaluate(_READ_TIMELINE_JS) or {}
+    except Exception:  # e.g. the page navigated after the send
+        return {}
+
+# ---- Completion detection ----
+# "observer": a MutationObserver in the page timestamps every DOM change and a single
+#             wait_for_function resolves once markers are gone and the DOM has been quiet
+# "poll":     the original inner_text() polling until the text is stable for 2 polls
+WAIT_MODE = os.environ.get("CHAT_WAIT_MODE", "observer").strip().lower()
+QUIET_MS = int(os.environ.get("CHAT_QUIET_MS", "800"))
+
+_OBSERVER_JS = """() => {
+  if (window.__uaskObserver) { return; }
+  window.__uaskLastMutation = performance.now();
+  window.__uaskObserver = new MutationObserver(() => { window.__uaskLastMutation = performance.now(); });
+  window.__uaskObserver.observe(document.body, {childList: true, subtree: true, characterData: true});
+}"""
+
+_SETTLED_JS = """({sel, markers, quietMs, minLen, base}) => {
+  const all = document.querySelectorAll(sel);
+  if (all.length <= base) { return false; }
+  const txt = (all[all.length - 1].innerText || '').trim();
+  if (txt.length < minLen || markers.some(m => txt.includes(m))) { return false; }
+  const now = performance.now();
+  if (now - window.__uaskLastMutation < quietMs) { return false; }
+  return {text: txt, quietFor: now - window.__uaskLastMutation};
+}"""
+
+def _wait_poll(container, page, timeout_ms: int, poll_ms: int = 500):
+    start = time.time(); last_txt=""; stable=0; changed_at=start
     while (time.time()-start)*1000 < timeout_ms:
         txt = container.inner_text().strip()
         if any(m in txt for m in LOADING_MARKERS) or len(txt) < 20:
-            page.wait_for_timeout(500); continue
+            page.wait_for_timeout(poll_ms); continue
         if txt == last_txt:
             stable += 1
         else:
-            stable = 0; last_txt = txt
+            stable = 0; last_txt = txt; changed_at = time.time()
         if stable >= 2:
-            return txt
-        page.wait_for_timeout(500)
+            # the text was final since (at the latest) the poll that first saw it
+            return txt, (time.time()-changed_at)*1000
+        page.wait_for_timeout(poll_ms)
     raise AssertionError(f"Timed out waiting for final response. Last seen:\n{last_txt}")
 
-def _send_and_get_answer(page, prompt: str) -> str:
+def _wait_observer(container, page, timeout_ms: int, quiet_ms: int, base: int = 0):
+    page.evaluate(_OBSERVER_JS)
+    try:
+        res = page.wait_for_function(
+            _SETTLED_JS,
+            arg={"sel": _RESPONSE_SEL, "markers": LOADING_MARKERS, "quietMs": quiet_ms, "minLen": 20, "base": base},
+            timeout=timeout_ms
+        ).json_value()
+    except PWTimeout:
+        last_txt = container.inner_text().strip() if container.count() else ""
+        raise AssertionError(f"Timed out waiting for final response. Last seen:\n{last_txt}")
+    return res["text"], res["quietFor"]
+
+def _wait_for_final_response(page, timeout_ms: int = 120000, mode: str = None, quiet_ms: int = None, timing: dict = None) -> str:
+    """
+    Waits until the response container of the last sent prompt holds the final answer and returns its text.
+    Detection latency (last DOM change -> detected) is attached to Allure and stored in `timing` if given.
+    """
+    mode = (mode or WAIT_MODE)
+    base = _send_base(page)
+    container = page.locator(_RESPONSE_SEL).nth(base)  # the new answer, never the previous one
+    container.wait_for(state="visible", timeout=45000)
+    start = time.time()
+    if mode == "observer":
+        try:
+            txt, detect_ms = _wait_observer(container, page, timeout_ms, quiet_ms or QUIET_MS, base)
+        except PWError as e:  # e.g. page navigated mid-wait; polling still works
+            print(f"[WARN] MutationObserver wait failed ({e}); falling back to polling")
+            mode = "poll"
+    if mode != "observer":
+        txt, detect_ms = _wait_poll(container, page, timeout_ms)
+    stats = {"mode": mode, "detect_ms": round(detect_ms), "wait_ms": round((time.time()-start)*1000)}
+    stats.update(_read_timeline(page))
+    allure.attach(json.dumps(stats), "response_wait", allure.attachment_type.JSON)
+    if timing is not None:
+        timing.update(stats)
+    return txt
+
+# ---- Network capture ----
+# Reads the answer straight from the chat API response/stream instead of the rendered DOM.
+# CHAT_CAPTURE=network turns it on for _send_and_get_answer; CHAT_API_PATTERN is a regex
+# matched against the URL of the POST request that carries the prompt.
+CAPTURE_MODE = os.environ.get("CHAT_CAPTURE", "dom").strip().lower()
+CHAT_API_PATTERN = os.environ.get("CHAT_API_PATTERN", r"/api/.*chat").strip()
+
+_TEXT_KEYS = ("answer", "content", "text", "delta", "message", "response")
+_SOURCE_KEYS = ("sources", "citations", "references")
+
+def _chunk_text(obj) -> str:
+    if isinstance(obj, str):
+        return obj
+    if isinstance(obj, dict):
+        if obj.get("choices"):  # OpenAI-style chunk
+            ch = obj["choices"][0]
+            return _chunk_text(ch.get("delta") or ch.get("message") or ch.get("text") or "")
+        for k in _TEXT_KEYS:
+            if obj.get(k):
+                return _chunk_text(obj[k])
+    return ""
+
+def _chunk_sources(obj) -> list:
+    out = []
+    if isinstance(obj, dict):
+        for k in _SOURCE_KEYS:
+            for src in obj.get(k) or []:
+                out.append(src if isinstance(src, str) else (src.get("url") or src.get("title") or json.dumps(src, ensure_ascii=False)))
+    return out
+
+def parse_chat_payload(body: str):
+    """
+    Assembles (answer, sources) from a chat API body: a single JSON document,
+    newline-delimited JSON, or a server-sent event stream of chunks.
+    """
+    try:
+        chunks = [json.loads(body)]
+    except ValueError:
+        chunks = []
+        for line in body.splitlines():
+            line = line.strip()
+            if line.startswith("data:"):
+                line = line[5:].strip()
+            elif line.startswith(("event:", "id:", "retry:", ":")):
+                continue
+            if not line or line == "[DONE]":
+                continue
+            try:
+                chunks.append(json.loads(line))
+            except ValueError:
+                chunks.append(line)
+    answer = "".join(_chunk_text(c) for c in chunks).strip()
+    sources = list(dict.fromkeys(s for c in chunks for s in _chunk_sources(c)))
+    return answer, sources
+
+def _is_chat_request(response) -> bool:
+    return response.request.method == "POST" and re.search(CHAT_API_PATTERN, response.url) is not None
+
+def _capture_answer(page, prompt: str, timeout_ms: int = 120000, timing: dict = None):
+    """
+    Sends the prompt and returns (answer, sources) parsed from the chat API payload.
+    Time-to-first-chunk and stream duration come from the request's network timing.
+    """
+    with page.expect_response(_is_chat_request, timeout=timeout_ms) as resp_info:
+        _type_and_send(page, prompt)
+    resp = resp_info.value
+    failure = resp.finished()  # waits until the whole stream has been received
+    if failure:
+        raise AssertionError(f"Chat API stream failed: {failure}")
+    answer, sources = parse_chat_payload(resp.text())
+    t = resp.request.timing
+    stats = {
+        "mode": "network",
+        "status": resp.status,
+        "ttfc_ms": round(t["responseStart"]) if t.get("responseStart", -1) >= 0 else None,
+        "stream_ms": round(t["responseEnd"] - t["responseStart"]) if min(t.get("responseStart", -1), t.get("responseEnd", -1)) >= 0 else None,
+        "sources": len(sources),
+    }
+    allure.attach(json.dumps(stats), "network_capture", allure.attachment_type.JSON)
+    if sources:
+        allure.attach("\n".join(sources), "answer_sources", allure.attachment_type.TEXT)
+    if timing is not None:
+        timing.update(stats)
+    if not answer:
+        raise AssertionError(f"Chat API response from {resp.url} had no answer text (status {resp.status})")
+    return answer, sources
+
+def _send_and_get_answer(page, prompt: str, capture: str = None, timing: dict = None) -> str:
+    if (capture or CAPTURE_MODE) == "network":
+        ans, _ = _capture_answer(page, prompt, timing=timing)
+        return _strip_sources(ans)
     _type_and_send(page, prompt)
-    ans = _wait_for_final_response(page)
+    ans = _wait_for_final_response(page, timing=timing)
     return _strip_sources(ans)
+
+
+class UiChat:
+    """
+    Browser chat transport (the default): prompt -> answer through the logged-in page.
+    """
+
+    def __init__(self, page):
+        self.page = page
+        self.last_timing = {}
+
+    def ask(self, prompt: str, intent: str = None, lang: str = None, raw: bool = False) -> str:
+        """
+        raw=True returns the rendered text including the Sources section.
+        """
+        self.last_timing = {}
+        if raw:
+            _type_and_send(self.page, prompt)
+            return _wait_for_final_response(self.page, timing=self.last_timing)
+        return _send_and_get_answer(self.page, prompt, timing=self.last_timing)
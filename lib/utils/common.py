@@ -18,4 +18,19 @@ def normalize(text: str) -> str:
 def _norm(t:str)->str:
     t = re.sub(r"[•\-–·]\s*", " ", t)
     t = re.sub(r"\s+", " ", t)
-    return t.strip().lower()
\ No newline at end of file
+    return t.strip().lower()
+
+def _looks_clean(text: str) -> bool:
+    # Reject <script>/<style> and obviously broken tags (very light check)
+    if re.search(r"<\s*(script|style)\b", text, flags=re.I): return False
+    # tolerate self-closing tags and small mismatch
+    opens = re.findall(r"<([a-zA-Z]+)[^>/]*>", text)
+    closes = re.findall(r"</([a-zA-Z]+)\s*>", text)
+    for t in ["br","hr","img","input","meta","link"]:  # ignore self-closers
+        opens = [x for x in opens if x.lower() != t]
+    return len(closes) <= len(opens) + 2
+
+GOV_ALLOW = r"(gdrfad\.gov\.ae|icp\.gov\.ae|u\.ae|gov\.ae)"
+def _links_are_gov_whitelisted(ans: str) -> bool:
+    urls = re.findall(r"https?://[^\s)\]]+", ans)
+    return all(re.search(GOV_ALLOW, u, flags=re.I) for u in urls)
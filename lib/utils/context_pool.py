@@ -0,0 +1,115 @@
+# ============================================================================= 
+# © 2025 [SapkalRohini77@gmail.com]. All rights reserved. 
+# This code is shared for evaluation purposes only with [NorthBay] 
+# Unauthorized use, copying, or redistribution is prohibited.
+# =============================================================================    
+
+# lib/utils/context_pool.py
+
+MOBILE_VIEWPORT = {"width": 390, "height": 844}
+DESKTOP_VIEWPORT = {"width": 1280, "height": 800}
+MOBILE_UA = ("Mozilla/5.0 (iPhone; CPU iPhone OS 16_0 like Mac OS X) AppleWebKit/605.1.15 "
+             "(KHTML, like Gecko) Version/16.0 Mobile/15E148 Safari/604.1")
+
+
+def context_options(locale: str, mobile: bool) -> dict:
+    """
+    new_context() keyword arguments for a locale / device profile.
+    """
+    return {
+        "locale": locale,
+        "viewport": MOBILE_VIEWPORT if mobile else DESKTOP_VIEWPORT,
+        "user_agent": MOBILE_UA if mobile else None,
+    }
+
+
+class ContextPool:
+    """
+    Per-worker pool of authenticated browser contexts keyed by (locale, mobile).
+    Pooled pages are already navigated to the app: a refill (done at checkout) only
+    waits for the navigation to commit, and the page keeps loading in the browser
+    while the current test runs. Playwright's sync API is single-threaded, so this is
+    where the "background" work happens.
+    """
+
+    def __init__(self, browser, base_url: str, size: int = 2, storage_state: str = None):
+        self.browser = browser
+        self.base_url = base_url
+        self.size = size
+        self.storage_state = storage_state
+        self._idle = {}
+        self.created = 0
+        self.recycled = 0
+
+    def _create(self, key):
+        locale, mobile = key
+        ctx = self.browser.new_context(**context_options(locale, mobile), storage_state=self.storage_state)
+        pg = ctx.new_page()
+        self.created += 1
+        self._navigate(pg)
+        return pg
+
+    def _navigate(self, pg):
+        pg.goto(self.base_url, wait_until="commit")
+
+    def _healthy(self, pg) -> bool:
+        if pg.is_closed():
+            return False
+        try:
+            pg.wait_for_load_state("domcontentloaded", timeout=15000)
+            return pg.evaluate("document.readyState") in ("interactive", "complete")
+        except Exception:
+            return False
+
+    def _discard(self, pg):
+        self.recycled += 1
+        try:
+            pg.context.close()
+        except Exception:
+            pass
+
+    def checkout(self, locale: str, mobile: bool):
+        """
+        A ready page for the test, then tops the pool up for the tests after it. A failed
+        refill is only logged: this test has its page, and the next checkout tries again.
+        """
+        key = (locale, mobile)
+        idle = self._idle.setdefault(key, [])
+        pg = None
+        while idle and pg is None:
+            pg = idle.pop(0)
+            if not self._healthy(pg):
+                self._discard(pg)
+                pg = None
+        pg = pg or self._create(key)
+        try:
+            while len(idle) < self.size - 1:  # the page checked out now normally comes back at checkin
+                idle.append(self._create(key))
+        except Exception as e:
+            print(f"[WARN] Context pool refill failed for {key}: {e}")
+        return pg
+
+    def checkin(self, pg, locale: str, mobile: bool):
+        """
+        Resets the page for the next test (fresh conversation, same login). Never raises:
+        it runs in the page fixture's teardown, after the test has passed or failed.
+        """
+        key = (locale, mobile)
+        idle = self._idle.setdefault(key, [])
+        try:
+            if pg.is_closed() or len(idle) >= self.size:
+                raise RuntimeError("not reusable")
+            pg.evaluate("() => { try { sessionStorage.clear(); } catch (e) {} }")
+            self._navigate(pg)
+            idle.append(pg)
+        except Exception:
+            self._discard(pg)
+
+    def close(self):
+        for idle in self._idle.values():
+            for pg in idle:
+                try:
+                    pg.context.close()
+                except Exception:
+                    pass
+        self._idle = {}
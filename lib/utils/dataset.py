@@ -0,0 +1,413 @@
+# ============================================================================= 
+# © 2025 [SapkalRohini77@gmail.com]. All rights reserved. 
+# This code is shared for evaluation purposes only with [NorthBay] 
+# Unauthorized use, copying, or redistribution is prohibited.
+# =============================================================================    
+
+# lib/utils/dataset.py
+#
+# The golden dataset, loaded and validated once per process and compiled for the suites:
+# cases by id and language, EN/AR pairs by base id, the run's facts compiled into one
+# matcher, and golden embeddings encoded in one batch the first time a score is asked for.
+#
+# Two formats, picked by TEST_DATA:
+#   data/test-data.json     one JSON file, held in memory
+#   data/golden/            JSONL shards + index.json (id -> shard/offset, lang, service, tags);
+#                           only the index is held in memory, cases are read on demand
+#   python -m lib.utils.dataset convert data/test-data.json data/golden --shard-size 500
+#   python -m lib.utils.dataset info data/golden --service emirates_id --sample 50
+
+import os
+import re
+import sys
+import json
+import random
+import argparse
+import numpy as np
+from functools import lru_cache
+from lib.utils.facts import FactMatcher
+
+DATA_PATH = os.path.join("data", "test-data.json")
+LANGS = ("en", "ar")
+INDEX_NAME = "index.json"
+FORMAT = "uask-golden-shards/1"
+SHARD_SIZE = 500
+
+
+def base_id(case_id: str) -> str:
+    """
+    Intent id shared by the EN and AR variants of a case: "faq_visa_en" -> "faq_visa".
+    """
+    return re.sub(r'_(en|ar)$', '', case_id or "")
+
+def _problems(p, i: int, seen: set) -> list:
+    where = f"prompts[{i}] ({p.get('id', 'no id') if isinstance(p, dict) else p!r})"
+    if not isinstance(p, dict):
+        return [f"{where}: not an object"]
+    problems = []
+    if not isinstance(p.get("id"), str) or not p["id"]:
+        problems.append(f"{where}: missing id")
+    elif p["id"] in seen:
+        problems.append(f"{where}: duplicate id")
+    seen.add(p.get("id"))
+    if p.get("lang") not in LANGS:
+        problems.append(f"{where}: lang must be one of {LANGS}")
+    if not isinstance(p.get("user") or p.get("prompt"), str):
+        problems.append(f"{where}: missing user prompt")
+    if "golden" in p and not isinstance(p["golden"], str):
+        problems.append(f"{where}: golden must be a string")
+    if "service" in p and not isinstance(p["service"], str):
+        problems.append(f"{where}: service must be a string")
+    if not isinstance(p.get("tags", []), list) or not all(isinstance(t, str) for t in p.get("tags", [])):
+        problems.append(f"{where}: tags must be a list of strings")
+    for key in ("threshold", "xl_threshold"):
+        if key in p and not (isinstance(p[key], (int, float)) and 0 <= p[key] <= 1):
+            problems.append(f"{where}: {key} must be a number in [0, 1]")
+    facts = p.get("must_contain", [])
+    if not isinstance(facts, list) or not all(isinstance(f, str) and f.strip() for f in facts):
+        problems.append(f"{where}: must_contain must be a list of non-empty strings")
+    return problems
+
+def _raise(problems: list, limit: int = 50):
+    more = f"\n  ... and {len(problems) - limit} more" if len(problems) > limit else ""
+    raise ValueError("Invalid test data:\n  " + "\n  ".join(problems[:limit]) + more)
+
+def _validate(data) -> list:
+    """
+    Schema check of the raw JSON; returns the prompts or raises ValueError listing every problem.
+    """
+    if not isinstance(data, dict) or not isinstance(data.get("prompts"), list) or not data["prompts"]:
+        raise ValueError('test data must be an object with a non-empty "prompts" list')
+    problems, seen = [], set()
+    for i, p in enumerate(data["prompts"]):
+        problems += _problems(p, i, seen)
+    if problems:
+        _raise(problems)
+    return data["prompts"]
+
+def _prepare(p: dict) -> dict:
+    return dict(p, user=p.get("user") or p.get("prompt", ""))
+
+def _meta(p: dict) -> tuple:
+    return p["lang"], p.get("service") or "", tuple(p.get("tags") or ())
+
+def _csv(value) -> tuple:
+    if value is None or isinstance(value, (list, tuple, set)):
+        return tuple(value or ())
+    return tuple(v.strip() for v in str(value).split(",") if v.strip())
+
+def _env_selection() -> dict:
+    """
+    Session-wide selection from DATA_TAGS, DATA_SERVICE (comma separated), DATA_SAMPLE and DATA_SEED
+    (set from --data-tags / --data-service / --data-sample in conftest).
+    """
+    sample = os.environ.get("DATA_SAMPLE", "").strip()
+    return {
+        "tags": _csv(os.environ.get("DATA_TAGS")),
+        "service": _csv(os.environ.get("DATA_SERVICE")),
+        "sample": int(sample) if sample else None,
+        "seed": int(os.environ.get("DATA_SEED", "0")),
+    }
+
+
+class _Cases:
+    """
+    Selection and scoring shared by both formats. Subclasses fill self._meta
+    ({case id: (lang, service, tags)}, in file order) and implement case(id).
+    """
+
+    def __contains__(self, case_id) -> bool:
+        return case_id in self._meta
+
+    def __len__(self) -> int:
+        return len(self._meta)
+
+    def ids(self) -> list:
+        return list(self._meta)
+
+    def case(self, case_id: str) -> dict:
+        raise NotImplementedError
+
+    def iter_cases(self, ids=None):
+        """
+        Yields the cases for ids (default: all), one at a time.
+        """
+        for case_id in (self.ids() if ids is None else ids):
+            yield self.case(case_id)
+
+    def select(self, lang=None, tags=None, service=None, sample: int = None, seed: int = None) -> list:
+        """
+        Case ids, in file order, with the given language(s), any of the tags and any of the services.
+        sample keeps that many intents (EN/AR variants stay together), drawn per service in
+        proportion to its size. Arguments left as None take the session selection (_env_selection);
+        the default seed is fixed so every xdist worker collects the same cases. Explicit tags
+        narrow the session's tag selection rather than replace it: a case needs one of each.
+        """
+        env = _env_selection()
+        langs = _csv(lang)
+        tag_sets = [set(t) for t in (_csv(tags), env["tags"]) if t]
+        services = set(_csv(service) if service is not None else env["service"])
+        sample = sample if sample is not None else env["sample"]
+        seed = seed if seed is not None else env["seed"]
+
+        ids = [cid for cid, (lg, svc, tg) in self._meta.items()
+               if (not langs or lg in langs) and (not services or svc in services) and all(t & set(tg) for t in tag_sets)]
+        if sample is None:
+            return ids
+        strata = {}
+        for cid in ids:
+            strata.setdefault(self._meta[cid][1], {}).setdefault(base_id(cid), None)
+        total = sum(len(b) for b in strata.values())
+        if sample >= total:
+            return ids
+        rng = random.Random(seed)
+        # largest remainder allocation of `sample` intents over the services
+        shares = {svc: sample * len(b) / total for svc, b in strata.items()}
+        quota = {svc: int(s) for svc, s in shares.items()}
+        for svc in sorted(shares, key=lambda s: (quota[s] - shares[s], s))[:sample - sum(quota.values())]:
+            quota[svc] += 1
+        keep = set()
+        for svc in sorted(strata):
+            keep.update(rng.sample(sorted(strata[svc]), quota[svc]))
+        return [cid for cid in ids if base_id(cid) in keep]
+
+    def pair_ids(self, ids=None) -> list:
+        """
+        (en id, ar id) for every base id that has both variants among ids (default: all).
+        """
+        by_base = {}
+        for cid in (self.ids() if ids is None else ids):
+            by_base.setdefault(base_id(cid), {})[self._meta[cid][0]] = cid
+        return [(d["en"], d["ar"]) for d in by_base.values() if "en" in d and "ar" in d]
+
+    def fact_matcher(self, extra=()) -> FactMatcher:
+        """
+        One automaton for the must_contain facts of the whole session selection, built on first
+        use; recompiled with `extra` when a test asks for facts outside that selection.
+        """
+        matcher = getattr(self, "_matcher", None)
+        if matcher is None:
+            matcher = FactMatcher(f for c in self.iter_cases(self.select()) for f in c.get("must_contain", []))
+        missing = [f for f in extra if f not in matcher]
+        if missing:
+            matcher = FactMatcher(matcher.patterns + missing)
+        self._matcher = matcher
+        return matcher
+
+    def fact_hits(self, case, answer: str) -> dict:
+        """
+        {fact: [(start, end), ...] in answer} for every must_contain fact of the case, in order;
+        an empty list is a missing fact. Case, whitespace and Arabic spelling variants are folded.
+        """
+        case = self.case(case) if isinstance(case, str) else case
+        facts = case.get("must_contain", [])
+        return self.fact_matcher(facts).hits(answer, facts)
+
+    def _golden_vector(self, case: dict, kind: str):
+        return None
+
+    def golden_score(self, case: dict, answer: str, kind: str = None) -> float:
+        """
+        Cosine similarity of an answer to the case's golden.
+        kind defaults to "en" for English cases and "xl" (multilingual) otherwise.
+        """
+        from lib.utils import semantics
+        kind = kind or ("en" if case["lang"] == "en" else "xl")
+        golden = (case.get("golden") or "").strip()
+        if not golden:
+            raise KeyError(f"Case {case['id']} has no golden answer")
+        ref = self._golden_vector(case, kind)
+        if ref is None:
+            return semantics.sim_many([(answer, golden)], lang=kind)[0]
+        vec = semantics.encode([answer], kind)[answer]
+        return float(np.dot(vec, ref))
+
+    def golden_alignment(self, case: dict, answer: str, kind: str = None) -> dict:
+        """
+        semantics.align() of an answer with the case's golden (sentence-level scoring mode).
+        """
+        from lib.utils import semantics
+        kind = kind or ("en" if case["lang"] == "en" else "xl")
+        return semantics.align(answer, (case.get("golden") or "").strip(), lang=kind)
+
+
+class Dataset(_Cases):
+    """
+    The single-file format, held in memory.
+    """
+
+    def __init__(self, prompts: list, path: str = None):
+        self.path = path
+        self.prompts = [_prepare(p) for p in prompts]
+        self.by_id = {p["id"]: p for p in self.prompts}
+        self._meta = {p["id"]: _meta(p) for p in self.prompts}
+        self._golden_vecs = {}
+
+    def case(self, case_id: str) -> dict:
+        return self.by_id[case_id]
+
+    def golden_vectors(self, kind: str) -> dict:
+        """
+        {case id: unit golden embedding} for the "en" or "xl" model of the active scorer backend,
+        encoded in one batch on first use (and served from the embedding cache across runs).
+        """
+        from lib.utils import semantics
+        key = (semantics.backend_name(), kind)
+        if key not in self._golden_vecs:
+            cases = [p for p in self.prompts if (p.get("golden") or "").strip()]
+            emb = semantics.encode([p["golden"].strip() for p in cases], kind)
+            self._golden_vecs[key] = {p["id"]: emb[p["golden"].strip()] for p in cases}
+        return self._golden_vecs[key]
+
+    def _golden_vector(self, case: dict, kind: str):
+        return self.golden_vectors(kind).get(case["id"])
+
+
+class ShardedDataset(_Cases):
+    """
+    A directory of JSONL shards (one case per line) and index.json:
+      {"format": FORMAT, "shards": ["shard-00000.jsonl", ...],
+       "cases": [[id, shard number, byte offset, lang, service, [tags]], ...]}
+    Memory grows with the index only; goldens are encoded per scored answer (the embedding
+    cache keeps them across runs) instead of all up front.
+    """
+
+    def __init__(self, path: str):
+        with open(os.path.join(path, INDEX_NAME), encoding="utf-8") as f:
+            index = json.load(f)
+        if index.get("format") != FORMAT:
+            raise ValueError(f"{path}: not a sharded golden dataset (format {index.get('format')!r})")
+        self.path = path
+        self.shards = index["shards"]
+        self._loc, self._meta = {}, {}
+        for cid, shard, offset, lang, service, tags in index["cases"]:
+            self._loc[cid] = (shard, offset)
+            self._meta[cid] = (lang, service, tuple(tags))
+
+    def _read(self, f, offset: int) -> dict:
+        f.seek(offset)
+        return _prepare(json.loads(f.readline()))
+
+    def case(self, case_id: str) -> dict:
+        shard, offset = self._loc[case_id]
+        with open(os.path.join(self.path, self.shards[shard]), "rb") as f:
+            return self._read(f, offset)
+
+    def iter_cases(self, ids=None):
+        """
+        Yields the cases for ids (default: all) in shard order, opening each shard once.
+        """
+        ids = self.ids() if ids is None else ids
+        f, current = None, None
+        try:
+            for case_id in sorted(ids, key=self._loc.__getitem__):
+                shard, offset = self._loc[case_id]
+                if shard != current:
+                    if f:
+                        f.close()
+                    f, current = open(os.path.join(self.path, self.shards[shard]), "rb"), shard
+                yield self._read(f, offset)
+        finally:
+            if f:
+                f.close()
+
+
+def write_sharded(cases, out_dir: str, shard_size: int = SHARD_SIZE) -> dict:
+    """
+    Writes cases (any iterable, consumed once) as JSONL shards plus index.json, validating each case.
+    Nothing replaces the existing dataset unless every case is valid. Returns the index summary.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    shards, rows, problems, seen = [], [], [], set()
+    f = None
+    try:
+        for i, p in enumerate(cases):
+            found = _problems(p, i, seen)
+            if found:
+                problems += found
+                continue
+            if len(rows) % shard_size == 0:
+                if f:
+                    f.close()
+                shards.append(f"shard-{len(shards):05d}.jsonl")
+                f = open(os.path.join(out_dir, shards[-1] + ".tmp"), "wb")
+            lang, service, tags = _meta(p)
+            rows.append([p["id"], len(shards) - 1, f.tell(), lang, service, list(tags)])
+            f.write(json.dumps(p, ensure_ascii=False).encode("utf-8") + b"\n")
+    finally:
+        if f:
+            f.close()
+    if problems or not rows:
+        for name in shards:
+            os.remove(os.path.join(out_dir, name + ".tmp"))
+        _raise(problems or ["no cases"])
+    for name in shards:
+        os.replace(os.path.join(out_dir, name + ".tmp"), os.path.join(out_dir, name))
+    for name in os.listdir(out_dir):  # shards of a previous, larger dataset
+        if re.fullmatch(r"shard-\d+\.jsonl", name) and name not in shards:
+            os.remove(os.path.join(out_dir, name))
+    tmp = os.path.join(out_dir, INDEX_NAME + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as idx:
+        json.dump({"format": FORMAT, "shards": shards, "cases": rows}, idx, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp, os.path.join(out_dir, INDEX_NAME))
+    return {"path": out_dir, "shards": len(shards), "cases": len(rows)}
+
+def convert(src: str, out_dir: str, shard_size: int = SHARD_SIZE) -> dict:
+    """
+    test-data.json -> sharded format.
+    """
+    with open(src, encoding="utf-8") as f:
+        return write_sharded(_validate(json.load(f)), out_dir, shard_size)
+
+
+@lru_cache(maxsize=None)
+def _load(path: str, mtime: float) -> _Cases:
+    if os.path.isdir(path):
+        return ShardedDataset(path)
+    with open(path, encoding="utf-8") as f:
+        return Dataset(_validate(json.load(f)), path)
+
+def load(path: str = None) -> _Cases:
+    """
+    The compiled dataset; parsed and validated once per process (again only if the file changes).
+    TEST_DATA points at another file or at a sharded dataset directory.
+    """
+    path = path or os.environ.get("TEST_DATA", DATA_PATH)
+    return _load(path, os.path.getmtime(os.path.join(path, INDEX_NAME) if os.path.isdir(path) else path))
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Golden dataset tools")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    cv = sub.add_parser("convert", help="test-data.json -> JSONL shards + index")
+    cv.add_argument("src")
+    cv.add_argument("out_dir")
+    cv.add_argument("--shard-size", type=int, default=SHARD_SIZE)
+    info = sub.add_parser("info", help="counts per language/service and what a selection picks")
+    info.add_argument("path", nargs="?", default=None)
+    info.add_argument("--lang")
+    info.add_argument("--tags")
+    info.add_argument("--service")
+    info.add_argument("--sample", type=int)
+    info.add_argument("--seed", type=int)
+    info.add_argument("--ids", action="store_true", help="print the selected ids")
+    args = ap.parse_args(argv)
+
+    if args.cmd == "convert":
+        print(json.dumps(convert(args.src, args.out_dir, args.shard_size)))
+        return 0
+    ds = load(args.path)
+    counts = {}
+    for lang, service, _ in ds._meta.values():
+        counts[(service or "-", lang)] = counts.get((service or "-", lang), 0) + 1
+    for (service, lang), n in sorted(counts.items()):
+        print(f"{service:<30} {lang:<3} {n:>7}")
+    ids = ds.select(lang=args.lang, tags=args.tags, service=args.service, sample=args.sample, seed=args.seed)
+    print(f"{len(ds)} cases, {len(ids)} selected, {len(ds.pair_ids(ids))} EN/AR pairs")
+    if args.ids:
+        print("\n".join(ids))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,215 @@
+# ============================================================================= 
+# © 2025 [SapkalRohini77@gmail.com]. All rights reserved. 
+# This code is shared for evaluation purposes only with [NorthBay] 
+# Unauthorized use, copying, or redistribution is prohibited.
+# =============================================================================    
+
+# lib/utils/embed_cache.py
+
+import os
+import re
+import json
+import time
+import uuid
+import atexit
+import hashlib
+import threading
+import contextlib
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process lock, last flush wins
+    fcntl = None
+
+DEFAULT_DIR = os.path.join(".cache", "embeddings")
+DEFAULT_MAX_ENTRIES = 50000
+
+
+def _text_key(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+def _slug(model: str) -> str:
+    return re.sub(r"[^\w.-]+", "__", model)
+
+
+class _ModelStore:
+    """
+    On-disk embeddings for one model: a memory-mapped vectors-<id>.npy matrix
+    plus index.json mapping text hash -> [row, last_used]. New vectors wait in pending
+    and cache hits in touched until flush; a run that only read rewrites index.json only.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.rows = {}
+        self.vectors = None
+        self.pending = {}
+        self.touched = {}
+        self._load()
+
+    @contextlib.contextmanager
+    def _locked(self, exclusive: bool):
+        """
+        Serializes flushes (and index reads against them) across xdist workers and overlapping runs.
+        """
+        if fcntl is None or not os.path.isdir(self.path):
+            yield
+            return
+        with open(os.path.join(self.path, ".lock"), "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _read_index(self):
+        try:
+            with open(os.path.join(self.path, "index.json"), encoding="utf-8") as f:
+                idx = json.load(f)
+        except FileNotFoundError:
+            return {}, None
+        except ValueError as e:
+            print(f"[WARN] Unreadable embedding cache index in {self.path}: {e}")
+            return {}, None
+        try:
+            vectors = np.load(os.path.join(self.path, idx["file"]), mmap_mode="r")
+        except (OSError, ValueError) as e:
+            print(f"[WARN] Embedding cache {self.path}: index points at unreadable {idx.get('file')}: {e}")
+            return {}, None
+        return idx["rows"], vectors
+
+    def _load(self):
+        with self._locked(exclusive=False):
+            self.rows, self.vectors = self._read_index()
+
+    def get(self, key: str):
+        if key in self.pending:
+            return self.pending[key][0]
+        hit = self.rows.get(key)
+        if hit is None or self.vectors is None:
+            return None
+        self.touched[key] = time.time()
+        return np.array(self.vectors[hit[0]])
+
+    def put(self, key: str, vec):
+        self.pending[key] = (np.asarray(vec, dtype=np.float32), time.time())
+
+    def flush(self, max_entries: int):
+        if not self.pending and not self.touched:
+            return
+        os.makedirs(self.path, exist_ok=True)
+        with self._locked(exclusive=True):
+            if self.pending:
+                self._flush_locked(max_entries)
+            else:
+                self._flush_touched()
+
+    def _write_index(self, fname: str, rows: dict):
+        tmp = os.path.join(self.path, f"index.{uuid.uuid4().hex[:8]}.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"file": fname, "rows": rows}, f)
+        os.replace(tmp, os.path.join(self.path, "index.json"))
+
+    def _flush_touched(self):
+        # Only last-used times changed: update them in the current index, vectors stay as they are
+        try:
+            with open(os.path.join(self.path, "index.json"), encoding="utf-8") as f:
+                idx = json.load(f)
+        except (OSError, ValueError):
+            idx = None
+        if idx:
+            for key, used in self.touched.items():
+                if key in idx["rows"]:
+                    idx["rows"][key][1] = max(idx["rows"][key][1], used)
+            self._write_index(idx["file"], idx["rows"])
+        self.touched = {}
+
+    def _flush_locked(self, max_entries: int):
+        # Merge with whatever other workers/runs wrote since we loaded
+        disk_rows, disk_vectors = self._read_index()
+        entries = {}
+        for src_rows, src_vectors in ((disk_rows, disk_vectors), (self.rows, self.vectors)):
+            if src_vectors is None:
+                continue
+            for key, (row, used) in src_rows.items():
+                used = max(used, self.touched.get(key, 0))
+                if key not in entries or entries[key][1] < used:
+                    entries[key] = (src_vectors[row], used)
+        entries.update(self.pending)
+
+        # Size-bounded eviction: keep the most recently used entries
+        keep = sorted(entries.items(), key=lambda kv: kv[1][1], reverse=True)[:max_entries]
+        if not keep:
+            return
+        fname = f"vectors-{uuid.uuid4().hex[:12]}.npy"
+        np.save(os.path.join(self.path, fname), np.stack([np.asarray(v, dtype=np.float32) for _, (v, _) in keep]))
+        self._write_index(fname, {key: [i, used] for i, (key, (_, used)) in enumerate(keep)})
+
+        self.pending = {}
+        self.touched = {}
+        self.rows, self.vectors = self._read_index()
+        # Only the index written above under the lock counts; an open mapping in another
+        # process stays readable after the unlink (POSIX)
+        for old in os.listdir(self.path):
+            if old.startswith("vectors-") and old != fname:
+                try:
+                    os.remove(os.path.join(self.path, old))
+                except OSError:
+                    pass  # Windows: still mapped by another worker; removed on a later flush
+
+
+class EmbeddingCache:
+    """
+    Content-addressed embedding store keyed by (model name, text hash).
+    Shared across runs and xdist workers through the cache directory.
+    """
+
+    def __init__(self, root: str = None, max_entries: int = None):
+        self.root = root or os.environ.get("EMBED_CACHE_DIR", DEFAULT_DIR)
+        self.max_entries = max_entries or int(os.environ.get("EMBED_CACHE_MAX", DEFAULT_MAX_ENTRIES))
+        self.hits = 0
+        self.misses = 0
+        self._stores = {}
+        self._lock = threading.Lock()
+        atexit.register(self.flush)
+
+    def _store(self, model: str) -> _ModelStore:
+        if model not in self._stores:
+            self._stores[model] = _ModelStore(os.path.join(self.root, _slug(model)))
+        return self._stores[model]
+
+    def get_many(self, model: str, texts) -> dict:
+        found = {}
+        with self._lock:
+            store = self._store(model)
+            for t in texts:
+                vec = store.get(_text_key(t))
+                if vec is None:
+                    self.misses += 1
+                else:
+                    self.hits += 1
+                    found[t] = vec
+        return found
+
+    def put_many(self, model: str, embeddings: dict) -> None:
+        with self._lock:
+            store = self._store(model)
+            for t, vec in embeddings.items():
+                store.put(_text_key(t), vec)
+
+    def flush(self) -> None:
+        with self._lock:
+            for store in self._stores.values():
+                try:
+                    store.flush(self.max_entries)
+                except Exception as e:
+                    print(f"[WARN] Could not persist embedding cache {store.path}: {e}")
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+        }
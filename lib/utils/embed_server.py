@@ -0,0 +1,190 @@
+# ============================================================================= 
+# © 2025 [SapkalRohini77@gmail.com]. All rights reserved. 
+# This code is shared for evaluation purposes only with [NorthBay] 
+# Unauthorized use, copying, or redistribution is prohibited.
+# =============================================================================    
+
+# lib/utils/embed_server.py
+#
+# One process loads the scorer models once and serves embeddings to every
+# pytest-xdist worker over a Unix socket:
+#   python -m lib.utils.embed_server --socket /tmp/uask-embed.sock
+# Workers use it when EMBED_SERVER_SOCKET points at that socket, and fall back
+# to in-process models when it is not reachable.
+
+import os
+import json
+import time
+import queue
+import socket
+import argparse
+import threading
+import socketserver
+import numpy as np
+
+DEFAULT_SOCKET = "/tmp/uask-embed.sock"
+
+
+# ---- Wire format: one JSON line per message, float32 payload after the response line ----
+def _send_json(sock, obj) -> None:
+    sock.sendall(json.dumps(obj, ensure_ascii=False).encode("utf-8") + b"\n")
+
+def _read_line(f) -> dict:
+    line = f.readline()
+    if not line:
+        raise ConnectionError("embedding server closed the connection")
+    return json.loads(line)
+
+
+# ---- Client ----
+def encode_remote(socket_path: str, backend: str, model: str, texts: list, timeout: float = 120.0) -> np.ndarray:
+    """
+    Encodes texts on the shared server. Raises OSError when the server is not reachable.
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+        s.settimeout(timeout)
+        s.connect(socket_path)
+        _send_json(s, {"backend": backend, "model": model, "texts": texts})
+        with s.makefile("rb") as f:
+            head = _read_line(f)
+            if "error" in head:
+                raise RuntimeError(f"embedding server: {head['error']}")
+            n, d = head["shape"]
+            buf = f.read(n * d * 4)
+    return np.frombuffer(buf, dtype=np.float32).reshape(n, d)
+
+def ping(socket_path: str, timeout: float = 0.5) -> bool:
+    if not socket_path or not hasattr(socket, "AF_UNIX") or not os.path.exists(socket_path):
+        return False
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+            s.settimeout(timeout)
+            s.connect(socket_path)
+            _send_json(s, {"ping": True})
+            with s.makefile("rb") as f:
+                return _read_line(f).get("ok", False)
+    except (OSError, ValueError):
+        return False
+
+
+# ---- Server ----
+class _MicroBatcher:
+    """
+    Collects concurrent encode requests for one (backend, model) for up to window_ms
+    and encodes all their distinct texts in a single batch.
+    """
+
+    def __init__(self, backend: str, model: str, window_ms: float, max_batch: int):
+        from lib.utils import semantics
+        self.scorer = semantics._backend_instance(backend)
+        self.model = semantics._model(model, backend)
+        self.window = window_ms / 1000.0
+        self.max_batch = max_batch
+        self.requests = queue.Queue()
+        self.batches = 0
+        self.encoded = 0
+        threading.Thread(target=self._run, daemon=True, name=f"batcher-{backend}-{model}").start()
+
+    def submit(self, texts: list) -> np.ndarray:
+        done = {"event": threading.Event()}
+        self.requests.put((texts, done))
+        done["event"].wait()
+        if "error" in done:
+            raise done["error"]
+        return done["vecs"]
+
+    def _run(self):
+        while True:
+            batch = [self.requests.get()]
+            size = len(batch[0][0])
+            deadline = time.monotonic() + self.window
+            while size < self.max_batch:
+                try:
+                    batch.append(self.requests.get(timeout=max(0.0, deadline - time.monotonic())))
+                    size += len(batch[-1][0])
+                except queue.Empty:
+                    break
+            uniq = list(dict.fromkeys(t for texts, _ in batch for t in texts))
+            try:
+                vecs = {}
+                if uniq:  # a batch of empty requests encodes nothing
+                    vecs = dict(zip(uniq, np.asarray(self.scorer.encode(self.model, uniq), dtype=np.float32)))
+                    self.batches += 1
+                    self.encoded += len(uniq)
+                for texts, done in batch:
+                    done["vecs"] = (np.stack([vecs[t] for t in texts]) if texts
+                                    else np.zeros((0, self.scorer.dim(self.model)), np.float32))
+            except Exception as e:
+                for _, done in batch:
+                    done["error"] = e
+            for _, done in batch:
+                done["event"].set()
+
+
+class EmbeddingServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, socket_path: str, window_ms: float = 5.0, max_batch: int = 256):
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        super().__init__(socket_path, _Handler)
+        self.window_ms = window_ms
+        self.max_batch = max_batch
+        self._batchers = {}
+        self._lock = threading.Lock()
+
+    def batcher(self, backend: str, model: str) -> _MicroBatcher:
+        with self._lock:
+            if (backend, model) not in self._batchers:
+                self._batchers[(backend, model)] = _MicroBatcher(backend, model, self.window_ms, self.max_batch)
+            return self._batchers[(backend, model)]
+
+    def server_close(self):
+        super().server_close()
+        try:
+            os.remove(self.server_address)
+        except OSError:
+            pass
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        try:
+            req = _read_line(self.rfile)
+            if req.get("ping"):
+                _send_json(self.request, {"ok": True})
+                return
+            vecs = self.server.batcher(req["backend"], req["model"]).submit(req["texts"])
+            vecs = np.ascontiguousarray(vecs, dtype=np.float32)
+            _send_json(self.request, {"shape": list(vecs.shape)})
+            self.request.sendall(vecs.tobytes())
+        except Exception as e:
+            try:
+                _send_json(self.request, {"error": f"{type(e).__name__}: {e}"})
+            except OSError:
+                pass
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Shared embedding server for parallel test workers")
+    ap.add_argument("--socket", default=os.environ.get("EMBED_SERVER_SOCKET") or DEFAULT_SOCKET)
+    ap.add_argument("--backend", default=os.environ.get("SCORER_BACKEND", "st"))
+    ap.add_argument("--window-ms", type=float, default=5.0, help="micro-batch collection window")
+    ap.add_argument("--max-batch", type=int, default=256, help="max texts per encoder batch")
+    args = ap.parse_args(argv)
+
+    from lib.utils import semantics
+    server = EmbeddingServer(args.socket, args.window_ms, args.max_batch)
+    for model in (semantics.MODEL_EN, semantics.MODEL_XL):
+        server.batcher(args.backend, model)  # load models before accepting work
+    print(f"Embedding server ({args.backend}) listening on {args.socket}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+# ============================================================================= 
+# © 2025 [SapkalRohini77@gmail.com]. All rights reserved. 
+# This code is shared for evaluation purposes only with [NorthBay] 
+# Unauthorized use, copying, or redistribution is prohibited.
+# =============================================================================    
+
+# lib/utils/facts.py
+#
+# must_contain fact matching. All facts of a run are compiled into one Aho-Corasick
+# automaton, so an answer is scanned once however many facts there are, and every hit
+# comes back with its position in the original answer. Answers and facts are folded the
+# same way: case, bullets/dashes and whitespace as in common._norm, plus the Arabic
+# variants a model writes interchangeably (diacritics, tatweel, alef forms, taa marbuta,
+# alef maqsura, hamza carriers, Arabic-Indic digits).
+
+from collections import deque
+
+# harakat, Quranic marks, superscript alef, tatweel, zero-width and direction marks
+_DROP = set(map(chr, [*range(0x0610, 0x061B), *range(0x064B, 0x0660), 0x0670, *range(0x06D6, 0x06EE),
+                      0x0640, *range(0x200B, 0x2010), 0x061C, 0xFEFF]))
+_SPACE = set("•-–·")
+_FOLD = {
+    "أ": "ا", "إ": "ا", "آ": "ا", "ٱ": "ا",
+    "ة": "ه",
+    "ى": "ي",
+    "ؤ": "و", "ئ": "ي",
+    **{chr(0x0660 + d): str(d) for d in range(10)},  # ٠-٩
+    **{chr(0x06F0 + d): str(d) for d in range(10)},  # ۰-۹ (Persian forms)
+}
+
+
+def fold(text: str):
+    """
+    Match-normalized text and, for every character of it, its index in the original text.
+    """
+    out, where = [], []
+    for i, ch in enumerate(text or ""):
+        if ch in _DROP:
+            continue
+        if ch in _SPACE or ch.isspace():
+            if out and out[-1] != " ":
+                out.append(" ")
+                where.append(i)
+            continue
+        for c in _FOLD.get(ch) or ch.lower():
+            out.append(c)
+            where.append(i)
+    if out and out[-1] == " ":
+        out.pop()
+        where.pop()
+    return "".join(out), where
+
+
+class FactMatcher:
+    """
+    Aho-Corasick automaton over the folded facts.
+    """
+
+    def __init__(self, facts):
+        self.patterns = []
+        self._ids = {}
+        for f in facts:
+            p = fold(f)[0]
+            if p and p not in self._ids:
+                self._ids[p] = len(self.patterns)
+                self.patterns.append(p)
+        self._goto, self._fail, self._out = [{}], [0], [[]]
+        for pid, p in enumerate(self.patterns):
+            s = 0
+            for ch in p:
+                if ch not in self._goto[s]:
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                    self._goto[s][ch] = len(self._goto) - 1
+                s = self._goto[s][ch]
+            self._out[s].append(pid)
+        queue = deque(self._goto[0].values())
+        while queue:  # breadth first, so a state's failure target is complete before it
+            s = queue.popleft()
+            for ch, t in self._goto[s].items():
+                queue.append(t)
+                f = self._fail[s]
+                while f and ch not in self._goto[f]:
+                    f = self._fail[f]
+                self._fail[t] = self._goto[f].get(ch, 0)
+                self._out[t] = self._out[t] + self._out[self._fail[t]]
+
+    def __len__(self) -> int:
+        return len(self.patterns)
+
+    def __contains__(self, fact: str) -> bool:
+        return fold(fact)[0] in self._ids
+
+    def find(self, text: str, whole_words: bool = False) -> dict:
+        """
+        {folded fact: [(start, end), ...]} for every fact found, as slices of the original text.
+        whole_words drops hits that start or end inside a word ("rephrase" in "rephrased").
+        """
+        folded, where = fold(text)
+        found = {}
+        s = 0
+        for i, ch in enumerate(folded):
+            while s and ch not in self._goto[s]:
+                s = self._fail[s]
+            s = self._goto[s].get(ch, 0)
+            for pid in self._out[s]:
+                start = i - len(self.patterns[pid]) + 1
+                if whole_words and ((start and folded[start - 1].isalnum())
+                                    or (i + 1 < len(folded) and folded[i + 1].isalnum())):
+                    continue
+                found.setdefault(self.patterns[pid], []).append((where[start], where[i] + 1))
+        return found
+
+    def hits(self, text: str, facts) -> dict:
+        """
+        {fact: [(start, end), ...]} for the given facts, in their order; [] for a fact not found.
+        """
+        found = self.find(text)
+        return {f: found.get(fold(f)[0], []) for f in facts}
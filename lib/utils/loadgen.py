@@ -0,0 +1,296 @@
+# ============================================================================= 
+# © 2025 [SapkalRohini77@gmail.com]. All rights reserved. 
+# This code is shared for evaluation purposes only with [NorthBay] 
+# Unauthorized use, copying, or redistribution is prohibited.
+# =============================================================================    
+
+# lib/utils/loadgen.py
+#
+# Load mode: drives prompts from data/test-data.json at an arrival rate (open loop)
+# or with N concurrent users (closed loop) for a fixed duration, and reports throughput,
+# error/fallback rate and latency percentiles per language.
+#   python -m lib.utils.loadgen --rate 2 --duration 60                 (API transport, login from config/.env)
+#   python -m lib.utils.loadgen --concurrency 4 --transport ui --duration 120
+#   python -m lib.utils.loadgen --standin --rate 5 --duration 20       (offline, against the local stand-in)
+
+import os
+import json
+import time
+import queue
+import random
+import argparse
+import threading
+from dotenv import load_dotenv
+from lib.utils.api_client import ChatApiClient
+from lib.utils.facts import FactMatcher, fold
+from lib.utils.dataset import load, DATA_PATH
+from lib.utils.perf_gate import percentile
+from lib.utils.auth import login, storage_state_path, storage_state_is_fresh, save_storage_state
+
+
+def _cases(data_path: str, langs) -> list:
+    ds = load(data_path)
+    cases = [p for p in ds.iter_cases(ds.select(lang=langs)) if p["user"]]
+    if not cases:
+        raise SystemExit(f"No prompts for languages {langs} in {data_path}")
+    return cases
+
+def _fallback_phrases(data_path: str) -> list:
+    """
+    The must_contain sets of the dataset's "fallback" cases: the phrases the suite itself
+    requires of the chatbot's "could not help" answer, one set per language.
+    """
+    ds = load(data_path)
+    return [tuple(c["must_contain"]) for c in ds.iter_cases()
+            if "fallback" in (c.get("tags") or []) and c.get("must_contain")]
+
+class _FallbackDetector:
+    """
+    An answer is a fallback when it holds every phrase of one fallback set, each as a whole
+    phrase, the same all-phrases rule test_fallback_message_shown applies.
+    """
+
+    def __init__(self, phrase_sets):
+        self.phrase_sets = [{fold(p)[0] for p in s} for s in phrase_sets if s]
+        self.matcher = FactMatcher(p for s in self.phrase_sets for p in s)
+
+    def __call__(self, answer: str) -> bool:
+        found = self.matcher.find(answer, whole_words=True) if self.phrase_sets else {}
+        return any(s <= found.keys() for s in self.phrase_sets)
+
+
+# ---- Transports (one per worker thread) ----
+class _ApiWorker:
+    def __init__(self, base_url: str, cookies: list):
+        # no retries: a load run has to see the failures a citizen would see
+        self.client = ChatApiClient(base_url, cookies=cookies, pool_size=1, retries=0)
+
+    def ask(self, prompt: str):
+        timing = {}
+        answer = self.client.send_and_get_answer(prompt, timing=timing)
+        return answer, timing
+
+    def close(self):
+        self.client.close()
+
+class _UiWorker:
+    """
+    Own Playwright instance per thread (the sync API is not thread-safe), one logged-in page.
+    """
+
+    def __init__(self, base_url: str, state_path: str, browser: str, headless: bool):
+        from playwright.sync_api import sync_playwright
+        from lib.utils.chat import UiChat
+        self._pw = sync_playwright().start()
+        self._browser = getattr(self._pw, browser).launch(headless=headless)
+        ctx = self._browser.new_context(storage_state=state_path)
+        page = ctx.new_page()
+        page.goto(base_url, wait_until="domcontentloaded")
+        self.chat = UiChat(page)
+
+    def ask(self, prompt: str):
+        answer = self.chat.ask(prompt)
+        return answer, dict(self.chat.last_timing)
+
+    def close(self):
+        self._browser.close()
+        self._pw.stop()
+
+
+def _browser_login(base_url: str, email: str, password: str, browser: str, headless: bool) -> str:
+    """
+    Logs in once through the browser and returns a storage-state file (reused while fresh).
+    """
+    path = storage_state_path("loadgen")
+    if storage_state_is_fresh(path, int(os.environ.get("AUTH_STATE_TTL", "1800"))):
+        return path
+    from playwright.sync_api import sync_playwright
+    with sync_playwright() as p:
+        b = getattr(p, browser).launch(headless=headless)
+        ctx = b.new_context()
+        login(ctx.new_page(), base_url, email, password)
+        save_storage_state(ctx, path)
+        b.close()
+    return path
+
+
+# ---- Load run ----
+class LoadRun:
+    def __init__(self, make_worker, cases: list, duration_s: float, rate: float = None, concurrency: int = None,
+                 max_inflight: int = 32, seed: int = None, poisson: bool = True, fallback_phrases=()):
+        if not rate and not concurrency:
+            raise ValueError("Give an arrival rate (open loop) or a concurrency (closed loop)")
+        self.make_worker = make_worker
+        self.cases = cases
+        self.is_fallback = _FallbackDetector(fallback_phrases)
+        self.duration_s = duration_s
+        self.rate = rate
+        self.workers = concurrency or max_inflight
+        self.poisson = poisson
+        self.rng = random.Random(seed)
+        self.results = []
+        self._lock = threading.Lock()
+        self._jobs = queue.Queue()
+        self._stop = threading.Event()
+
+    def _one(self, worker, case: dict, intended: float) -> None:
+        started = time.perf_counter()
+        rec = {"id": case.get("id"), "lang": case.get("lang", "unknown"), "error": None, "fallback": False,
+               "queue_ms": round((started - intended) * 1000), "ttfc_ms": None}
+        try:
+            answer, timing = worker.ask(case["user"])
+            # a fallback case is supposed to get the fallback answer
+            rec["fallback"] = "fallback" not in (case.get("tags") or []) and self.is_fallback(answer)
+            rec["ttfc_ms"] = timing.get("ttfc_ms", timing.get("first_content_ms"))
+        except Exception as e:
+            rec["error"] = f"{type(e).__name__}: {str(e).splitlines()[0] if str(e) else ''}"
+        # open loop: latency counts from the scheduled arrival, so a backed-up system is not hidden
+        rec["latency_ms"] = round((time.perf_counter() - intended) * 1000)
+        with self._lock:
+            self.results.append(rec)
+
+    def _worker_loop(self) -> None:
+        worker = None
+        try:
+            worker = self.make_worker()
+            while True:
+                if self.rate:
+                    job = self._jobs.get()
+                    if job is None:
+                        return
+                    self._one(worker, *job)
+                else:
+                    if self._stop.is_set():
+                        return
+                    self._one(worker, self.rng.choice(self.cases), time.perf_counter())
+        except Exception as e:
+            with self._lock:
+                self.results.append({"id": None, "lang": "setup", "error": f"worker setup failed: {e}",
+                                     "fallback": False, "latency_ms": None, "queue_ms": None, "ttfc_ms": None})
+        finally:
+            if worker:
+                worker.close()
+
+    def run(self) -> dict:
+        threads = [threading.Thread(target=self._worker_loop, name=f"load-{i}", daemon=True) for i in range(self.workers)]
+        for t in threads:
+            t.start()
+        t0 = time.perf_counter()
+        end = t0 + self.duration_s
+        if self.rate:
+            nxt = t0
+            while nxt < end:
+                time.sleep(max(0.0, nxt - time.perf_counter()))
+                self._jobs.put((self.rng.choice(self.cases), nxt))
+                nxt += self.rng.expovariate(self.rate) if self.poisson else 1.0 / self.rate
+            for _ in threads:
+                self._jobs.put(None)
+        else:
+            time.sleep(self.duration_s)
+            self._stop.set()
+        for t in threads:
+            t.join()
+        return self.report(time.perf_counter() - t0)
+
+    def report(self, elapsed_s: float) -> dict:
+        by_lang = {}
+        for r in self.results:
+            by_lang.setdefault(r["lang"], []).append(r)
+        by_lang["all"] = [r for r in self.results if r["lang"] != "setup"]
+
+        def summary(rs):
+            ok = [r for r in rs if not r["error"]]
+            lat = [r["latency_ms"] for r in ok]
+            ttfc = [r["ttfc_ms"] for r in ok if r["ttfc_ms"] is not None]
+            return {
+                "requests": len(rs), "ok": len(ok), "errors": len(rs) - len(ok),
+                "error_rate": round((len(rs) - len(ok)) / len(rs), 4) if rs else 0.0,
+                "fallback_rate": round(sum(r["fallback"] for r in ok) / len(ok), 4) if ok else 0.0,
+                "throughput_rps": round(len(ok) / elapsed_s, 3) if elapsed_s else 0.0,
+                "p50_ms": percentile(lat, 50), "p95_ms": percentile(lat, 95), "p99_ms": percentile(lat, 99),
+                "ttfc_p50_ms": percentile(ttfc, 50), "ttfc_p95_ms": percentile(ttfc, 95),
+            }
+
+        errors = {}
+        for r in self.results:
+            if r["error"]:
+                errors[r["error"]] = errors.get(r["error"], 0) + 1
+        return {
+            "mode": "open" if self.rate else "closed",
+            "rate": self.rate, "workers": self.workers, "duration_s": self.duration_s,
+            "elapsed_s": round(elapsed_s, 2),
+            "by_lang": {lang: summary(rs) for lang, rs in sorted(by_lang.items())},
+            "errors": dict(sorted(errors.items(), key=lambda kv: -kv[1])[:10]),
+        }
+
+
+def _print_report(rep: dict) -> None:
+    print(f"mode={rep['mode']} rate={rep['rate']} workers={rep['workers']} elapsed={rep['elapsed_s']}s")
+    print(f"{'lang':<6} {'req':>6} {'ok':>6} {'err%':>7} {'fallback%':>10} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'ttfc50':>8}")
+    for lang, s in rep["by_lang"].items():
+        print(f"{lang:<6} {s['requests']:>6} {s['ok']:>6} {s['error_rate']:>7.1%} {s['fallback_rate']:>10.1%} "
+              f"{s['throughput_rps']:>8} {str(s['p50_ms']):>8} {str(s['p95_ms']):>8} {str(s['p99_ms']):>8} {str(s['ttfc_p50_ms']):>8}")
+    for err, n in rep["errors"].items():
+        print(f"  {n} x {err}")
+
+def main(argv=None):
+    load_dotenv(dotenv_path=os.path.join("config", ".env"))
+    ap = argparse.ArgumentParser(description="Open/closed-loop load generation against the chatbot")
+    mode = ap.add_mutually_exclusive_group(required=True)
+    mode.add_argument("--rate", type=float, help="open loop: prompt arrivals per second")
+    mode.add_argument("--concurrency", type=int, help="closed loop: number of concurrent users")
+    ap.add_argument("--duration", type=float, default=60, help="seconds to generate load for")
+    ap.add_argument("--max-inflight", type=int, default=32, help="open loop: worker threads serving arrivals")
+    ap.add_argument("--constant", action="store_true", help="open loop: evenly spaced arrivals instead of Poisson")
+    ap.add_argument("--transport", choices=["api", "ui"], default="api")
+    ap.add_argument("--lang", default="", help="comma separated languages to draw prompts from (default all)")
+    ap.add_argument("--data", default=DATA_PATH)
+    ap.add_argument("--state", default=None, help="Playwright storage state to take the login from")
+    ap.add_argument("--standin", action="store_true", help="start the local stand-in app and load it instead")
+    ap.add_argument("--browser", default=os.environ.get("BROWSER", "chromium"))
+    ap.add_argument("--seed", type=int, default=None)
+    ap.add_argument("--out", default=None, help="default: reports/load/load_<timestamp>.json")
+    args = ap.parse_args(argv)
+
+    base_url = os.environ.get("BASE_URL", "https://govgpt.sandbox.dge.gov.ae/").strip()
+    email, password = os.environ.get("EMAIL", "").strip(), os.environ.get("PASSWORD", "").strip()
+    server = None
+    if args.standin:
+        from lib.utils.standin_server import StandinServer
+        server = StandinServer().start()
+        base_url, email, password = server.url, "standin@example.com", "standin"
+
+    try:
+        if args.transport == "api":
+            if args.state:
+                cookies = json.load(open(args.state, encoding="utf-8")).get("cookies", [])
+            elif server:
+                cookies = server.login_cookies(email, password)
+            else:
+                state = _browser_login(base_url, email, password, args.browser, True)
+                cookies = json.load(open(state, encoding="utf-8")).get("cookies", [])
+            make_worker = lambda: _ApiWorker(base_url, cookies)
+        else:
+            state = args.state or _browser_login(base_url, email, password, args.browser, True)
+            make_worker = lambda: _UiWorker(base_url, state, args.browser, True)
+
+        cases = _cases(args.data, [l.strip() for l in args.lang.split(",") if l.strip()])
+        run = LoadRun(make_worker, cases, args.duration, rate=args.rate, concurrency=args.concurrency,
+                      max_inflight=args.max_inflight, seed=args.seed, poisson=not args.constant,
+                      fallback_phrases=_fallback_phrases(args.data))
+        rep = run.run()
+    finally:
+        if server:
+            server.stop()
+
+    rep.update({"transport": args.transport, "base_url": base_url, "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z")})
+    out = args.out or os.path.join("reports", "load", f"load_{time.strftime('%Y%m%d_%H%M%S')}.json")
+    os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(rep, f, ensure_ascii=False, indent=2)
+    _print_report(rep)
+    print(f"Load report: {out}")
+
+
+if __name__ == "__main__":
+    main()
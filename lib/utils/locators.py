@@ -0,0 +1,108 @@
+# ============================================================================= 
+# © 2025 [SapkalRohini77@gmail.com]. All rights reserved. 
+# This code is shared for evaluation purposes only with [NorthBay] 
+# Unauthorized use, copying, or redistribution is prohibited.
+# =============================================================================    
+
+# lib/utils/locators.py
+
+import time
+
+# Named targets with ordered selector candidates (first match wins)
+TARGETS = {
+    "login_credentials": ["//button[normalize-space(.)='Login using Credentials']"],
+    "email": ["#email"],
+    "password": ["#password"],
+    "sign_in": ["//button[@type='submit' and normalize-space()='Sign in']"],
+    "composer": ["//div[@id='chat-input']//p", "#chat-input [contenteditable='true']"],
+    "send_button": ["//button[@type='submit']"],
+    "response": ["(//div[@id='response-content-container'])[last()]", "#response-content-container"],
+}
+
+# Per-session memory of which frame/selector won for each target
+_winners = {}
+# Per-target lookup telemetry, aggregated as lookups happen (see lookup_stats)
+_stats = {}
+
+
+def _frames(scope):
+    # A Page searches all of its frames (main frame first); a Frame only itself
+    if hasattr(scope, "main_frame"):
+        return [scope.main_frame] + [f for f in scope.frames if f != scope.main_frame]
+    return [scope]
+
+def _frame_key(frame) -> str:
+    return "main" if frame.parent_frame is None else (frame.name or frame.url)
+
+def _matches(loc, state: str) -> bool:
+    try:
+        if not loc.count():
+            return False
+        return state != "visible" or loc.is_visible()
+    except Exception:  # frame detached mid-scan
+        return False
+
+def _record(target: str, start: float, cached: bool, found: bool) -> None:
+    ms = round((time.perf_counter() - start) * 1000, 1)
+    s = _stats.setdefault(target, {"count": 0, "total_ms": 0.0, "max_ms": 0.0, "cached": 0, "not_found": 0})
+    s["count"] += 1
+    s["total_ms"] = round(s["total_ms"] + ms, 1)
+    s["max_ms"] = max(s["max_ms"], ms)
+    s["cached"] += cached
+    s["not_found"] += not found
+
+def find_any(scope, names, timeout: int = 15000, state: str = "visible"):
+    """
+    Races several named targets: whichever shows up first, in any frame, wins.
+    Returns (name, frame, locator); raises AssertionError when none matches within timeout ms.
+    """
+    start = time.perf_counter()
+    deadline = start + timeout / 1000.0
+    while True:
+        for name in names:
+            winner = _winners.get(name)
+            candidates = [(f, sel) for f in _frames(scope) for sel in TARGETS[name]]
+            if winner:
+                candidates.sort(key=lambda c: (_frame_key(c[0]), c[1]) != winner)
+            for frame, sel in candidates:
+                loc = frame.locator(sel).first
+                if _matches(loc, state):
+                    key = (_frame_key(frame), sel)
+                    _record(name, start, key == winner, True)
+                    _winners[name] = key
+                    return name, frame, loc
+        if time.perf_counter() >= deadline:
+            break
+        _frames(scope)[0].wait_for_timeout(100)  # lets Playwright process frame attach/navigate events
+    _record("|".join(names), start, False, False)
+    raise AssertionError(f"{' / '.join(repr(n) for n in names)} not found in any frame within {timeout} ms: "
+                         f"{[sel for n in names for sel in TARGETS[n]]}")
+
+def find(scope, name: str, timeout: int = 15000, state: str = "visible"):
+    """
+    Looks for the named target across every frame of the page in one pass per tick,
+    instead of a separate timeout per frame. Returns (frame, locator).
+    Raises AssertionError when nothing matches within timeout ms.
+    """
+    return find_any(scope, (name,), timeout, state)[1:]
+
+def css(name: str) -> str:
+    """
+    The target's first CSS candidate, for page scripts that query it with querySelectorAll.
+    """
+    for sel in TARGETS[name]:
+        if not sel.startswith(("/", "(", "xpath=")):
+            return sel
+    raise KeyError(f"'{name}' has no CSS selector candidate: {TARGETS[name]}")
+
+def resolve(scope, name: str, timeout: int = 15000, state: str = "visible"):
+    """
+    Locator for the named target, see find().
+    """
+    return find(scope, name, timeout, state)[1]
+
+def lookup_stats() -> dict:
+    """
+    Per-target lookup telemetry: count, total/max ms, cache hits and misses (not found).
+    """
+    return {t: dict(s) for t, s in _stats.items()}
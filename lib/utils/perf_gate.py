@@ -0,0 +1,203 @@
+# ============================================================================= 
+# © 2025 [SapkalRohini77@gmail.com]. All rights reserved. 
+# This code is shared for evaluation purposes only with [NorthBay] 
+# Unauthorized use, copying, or redistribution is prohibited.
+# =============================================================================    
+
+# lib/utils/perf_gate.py
+#
+# Latency regression gate. Keeps per intent/language/transport baselines (p50/p95 of time to final
+# answer and to first content, median answer length) over the last N runs in a local file,
+# compares each run's prompt timings against them and warns or fails the session when an
+# intent got slower (or its answers much shorter/longer) beyond a tolerance.
+#   pytest tests/genai --perf-gate=warn|fail|record      (PERF_GATE in config/.env)
+
+import os
+import json
+import math
+import time
+import uuid
+import allure
+
+DEFAULT_PATH = os.path.join("data", "perf_baseline.json")
+MODES = ("off", "record", "warn", "fail")
+
+
+def percentile(values: list, q: float):
+    if not values:
+        return None
+    v = sorted(values)
+    return v[max(0, math.ceil(q / 100.0 * len(v)) - 1)]  # nearest rank
+
+def _latency(rec: dict):
+    return rec.get("final_stable_ms") if rec.get("final_stable_ms") is not None else rec.get("detected_ms")
+
+def _key(rec: dict) -> str:
+    # UI, API and async latencies are not comparable; replayed answers are never gated
+    return f"{rec.get('intent')}|{rec.get('lang')}|{rec.get('transport') or 'ui'}"
+
+def summarize(records: list) -> dict:
+    """
+    {"intent|lang|transport": {"samples", "p50_ms", "p95_ms", "ttfc_p50_ms", "ttfc_p95_ms", "chars_p50"}}
+    """
+    groups = {}
+    for r in records:
+        groups.setdefault(_key(r), []).append(r)
+    out = {}
+    for key, rs in groups.items():
+        lat = [_latency(r) for r in rs if _latency(r) is not None]
+        ttfc = [r["first_content_ms"] for r in rs if r.get("first_content_ms") is not None]
+        chars = [r["answer_chars"] for r in rs if r.get("answer_chars") is not None]
+        out[key] = {
+            "samples": len(lat),
+            "p50_ms": percentile(lat, 50), "p95_ms": percentile(lat, 95),
+            "ttfc_p50_ms": percentile(ttfc, 50), "ttfc_p95_ms": percentile(ttfc, 95),
+            "chars_p50": percentile(chars, 50),
+        }
+    return out
+
+
+class Baseline:
+    """
+    The baseline file: {"runs": [{"run_id", "timestamp", "records": [slim timing records]}]}.
+    Statistics pool the samples of the newest `runs` runs.
+    """
+
+    def __init__(self, path: str = None, runs: int = None):
+        self.path = path or os.environ.get("PERF_BASELINE", DEFAULT_PATH)
+        self.runs = runs or int(os.environ.get("PERF_BASELINE_RUNS", "10"))
+        self.data = {"runs": []}
+        if os.path.exists(self.path):
+            with open(self.path, encoding="utf-8") as f:
+                self.data = json.load(f)
+        self._stats = None
+
+    def stats(self) -> dict:
+        if self._stats is None:
+            pooled = [r for run in self.data["runs"][-self.runs:] for r in run["records"]]
+            self._stats = summarize(pooled)
+        return self._stats
+
+    def append_run(self, run_id: str, records: list) -> None:
+        slim = [{k: r.get(k) for k in ("intent", "lang", "transport", "final_stable_ms", "detected_ms", "first_content_ms", "answer_chars")}
+                for r in records]
+        self.data["runs"] = [r for r in self.data["runs"] if r["run_id"] != run_id]
+        self.data["runs"].append({"run_id": run_id, "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"), "records": slim})
+        self.data["runs"] = self.data["runs"][-self.runs:]
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.data, f, ensure_ascii=False, indent=1)
+        os.replace(tmp, self.path)
+        self._stats = None
+
+
+def _tolerance() -> float:
+    return float(os.environ.get("PERF_TOLERANCE", "0.25"))
+
+def _length_tolerance() -> float:
+    return float(os.environ.get("PERF_LENGTH_TOLERANCE", "0.5"))
+
+def _min_samples() -> int:
+    return int(os.environ.get("PERF_MIN_SAMPLES", "3"))
+
+def compare(current: dict, baseline: dict, tolerance: float = None, length_tolerance: float = None,
+            min_samples: int = None) -> list:
+    """
+    One row per intent|lang|transport and metric: p50/p95 latency and time to first content must not exceed
+    baseline * (1 + tolerance); the median answer length must stay within length_tolerance.
+    Intents with fewer than min_samples baseline samples are reported as "no_baseline".
+    """
+    tol = _tolerance() if tolerance is None else tolerance
+    ltol = _length_tolerance() if length_tolerance is None else length_tolerance
+    need = _min_samples() if min_samples is None else min_samples
+    rows = []
+    for key, cur in sorted(current.items()):
+        base = baseline.get(key)
+        if not base or base["samples"] < need:
+            rows.append({"key": key, "metric": "all", "base": None, "current": None, "ratio": None, "verdict": "no_baseline"})
+            continue
+        for metric in ("p50_ms", "p95_ms", "ttfc_p50_ms", "ttfc_p95_ms", "chars_p50"):
+            b, c = base.get(metric), cur.get(metric)
+            if b is None or c is None or b == 0:
+                continue
+            ratio = c / b
+            if metric == "chars_p50":
+                verdict = "regression" if abs(ratio - 1) > ltol else "ok"
+            else:
+                verdict = "regression" if ratio > 1 + tol else ("improvement" if ratio < 1 - tol else "ok")
+            rows.append({"key": key, "metric": metric, "base": b, "current": c, "ratio": round(ratio, 3), "verdict": verdict})
+    return rows
+
+def check_prompt(rec: dict, baseline: dict, tolerance: float = None) -> dict:
+    """
+    Single-prompt view for the test's report: this answer's latency against the intent's baseline p95.
+    """
+    tol = _tolerance() if tolerance is None else tolerance
+    base = baseline.get(_key(rec))
+    out = {"intent": rec.get("intent"), "lang": rec.get("lang"), "latency_ms": _latency(rec),
+           "first_content_ms": rec.get("first_content_ms"), "answer_chars": rec.get("answer_chars"),
+           "baseline": base, "tolerance": tol}
+    if not base or base["samples"] < _min_samples() or out["latency_ms"] is None:
+        out["verdict"] = "no_baseline"
+    else:
+        out["verdict"] = "slow" if out["latency_ms"] > base["p95_ms"] * (1 + tol) else "ok"
+    return out
+
+def attach_prompt_check(rec: dict, baseline: "Baseline") -> dict:
+    res = check_prompt(rec, baseline.stats())
+    allure.attach(json.dumps(res, ensure_ascii=False, indent=2), f"latency_vs_baseline::{rec.get('case_id') or rec.get('intent')}",
+                  allure.attachment_type.JSON)
+    return res
+
+def run_gate(records: list, run_id: str, mode: str, baseline: "Baseline" = None) -> dict:
+    """
+    Compares the run against the baseline, then adds the run to the baseline unless it regressed
+    ("record" always adds it). Returns the report; report["failed"] is True only in "fail" mode.
+    """
+    baseline = baseline or Baseline()
+    records = [r for r in records if r.get("mode") != "replay"]
+    current = summarize(records)
+    rows = compare(current, baseline.stats())
+    regressions = [r for r in rows if r["verdict"] == "regression"]
+    if records and (mode == "record" or not regressions):
+        baseline.append_run(run_id, records)
+    return {
+        "run_id": run_id, "mode": mode, "baseline": baseline.path, "tolerance": _tolerance(),
+        "length_tolerance": _length_tolerance(), "current": current, "rows": rows,
+        "regressions": regressions, "failed": mode == "fail" and bool(regressions),
+    }
+
+def regression_lines(report: dict) -> list:
+    return [f"{r['key']} {r['metric']}: {r['base']} -> {r['current']} (x{r['ratio']})" for r in report["regressions"]]
+
+def write_allure_result(report: dict, results_dir: str) -> str:
+    """
+    Adds the run-level gate to allure-results as its own "Latency gate" result, failed when any
+    intent|lang|transport regressed, with the regressed keys as its message and the full report
+    attached. Returns the result file path.
+    """
+    os.makedirs(results_dir, exist_ok=True)
+    rid = str(uuid.uuid4())
+    attachment = f"{rid}-attachment.json"
+    with open(os.path.join(results_dir, attachment), "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    lines = regression_lines(report)
+    if lines:
+        note = "" if report["mode"] == "fail" else f" ({report['mode']} mode: the session was not failed)"
+        message = f"{len(lines)} regression(s) beyond {report['tolerance']:.0%}{note}:\n" + "\n".join(lines)
+    else:
+        message = f"no regression beyond {report['tolerance']:.0%}"
+    now = int(time.time() * 1000)
+    result = {
+        "uuid": rid, "historyId": "perf_gate", "fullName": "perf_gate.run_gate", "name": "Latency gate",
+        "status": "failed" if lines else "passed", "stage": "finished",
+        "statusDetails": {"message": message}, "start": now, "stop": now,
+        "labels": [{"name": "suite", "value": "Performance"}, {"name": "feature", "value": "Latency regression gate"}],
+        "parameters": [{"name": "mode", "value": report["mode"]}, {"name": "run_id", "value": report["run_id"]}],
+        "attachments": [{"name": "perf_gate_report", "source": attachment, "type": "application/json"}],
+    }
+    path = os.path.join(results_dir, f"{rid}-result.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+    return path
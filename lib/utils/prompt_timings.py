@@ -0,0 +1,161 @@
+# ============================================================================= 
+# © 2025 [SapkalRohini77@gmail.com]. All rights reserved. 
+# This code is shared for evaluation purposes only with [NorthBay] 
+# Unauthorized use, copying, or redistribution is prohibited.
+# =============================================================================    
+
+# lib/utils/prompt_timings.py
+#
+# One timing record per prompt: send click, container visible, first loading marker,
+# first real content, final stable text (ms after the send click) and answer length.
+# Each record is attached to Allure and appended to reports/timings/prompt_timings.jsonl;
+# per intent/language aggregates go to a Prometheus textfile at session end.
+
+import os
+import json
+import time
+import allure
+from lib.utils.chat import _strip_sources
+from lib.utils.artifact_store import RUN_ID
+from lib.utils.perf_gate import attach_prompt_check
+from lib.utils.dataset import base_id
+
+FIELDS = ("container_visible_ms", "first_marker_ms", "first_content_ms", "final_stable_ms", "detected_ms")
+_RECORDS = []
+
+
+def _dir() -> str:
+    return os.environ.get("PROMPT_TIMINGS_DIR", os.path.join("reports", "timings"))
+
+def _worker() -> str:
+    return os.environ.get("PYTEST_XDIST_WORKER", "main")
+
+def _intent(case_id: str) -> str:
+    return base_id(case_id) or "adhoc"
+
+def normalize(timing: dict) -> dict:
+    """
+    Maps the transport-specific timing keys onto FIELDS:
+    UI (DOM timeline), network capture / API (time to first chunk, total) and the async runner.
+    """
+    t = dict(timing or {})
+    out = {f: t.get(f) for f in FIELDS}
+    if out["first_content_ms"] is None and t.get("ttfc_ms") is not None:
+        out["first_content_ms"] = t["ttfc_ms"]
+    if out["final_stable_ms"] is None:
+        if t.get("total_ms") is not None:
+            out["final_stable_ms"] = t["total_ms"]
+        elif t.get("ttfc_ms") is not None and t.get("stream_ms") is not None:
+            out["final_stable_ms"] = t["ttfc_ms"] + t["stream_ms"]
+    if out["detected_ms"] is None and t.get("total_ms") is not None:
+        out["detected_ms"] = t["total_ms"]
+    return out
+
+def record_prompt(answer: str, timing: dict, intent: str = None, lang: str = None, transport: str = None) -> dict:
+    """
+    Builds the timing record for one prompt, attaches it and appends it to the JSONL sink.
+    """
+    rec = {
+        "run_id": RUN_ID,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "case_id": intent,
+        "intent": _intent(intent),
+        "lang": lang or "unknown",
+        "transport": transport,
+        "mode": (timing or {}).get("mode"),
+        "send_epoch_ms": (timing or {}).get("send_epoch_ms"),
+        **normalize(timing),
+        "answer_chars": len(_strip_sources(answer or "")),
+    }
+    _RECORDS.append(rec)
+    allure.attach(json.dumps(rec, ensure_ascii=False, indent=2), "prompt_timing", allure.attachment_type.JSON)
+    try:
+        os.makedirs(_dir(), exist_ok=True)
+        with open(os.path.join(_dir(), "prompt_timings.jsonl"), "a", encoding="utf-8") as f:
+            f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+    except OSError as e:
+        print(f"[WARN] Could not write prompt timing: {e}")
+    return rec
+
+def records() -> list:
+    return list(_RECORDS)
+
+def run_records(run_id: str = None) -> list:
+    """
+    All records of one run from the JSONL sink, i.e. from every xdist worker.
+    """
+    path = os.path.join(_dir(), "prompt_timings.jsonl")
+    if not os.path.exists(path):
+        return []
+    run_id = run_id or RUN_ID
+    out = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                rec = json.loads(line)
+                if rec.get("run_id") == run_id:
+                    out.append(rec)
+    return out
+
+
+def _esc(v: str) -> str:
+    return str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", " ")
+
+def write_prometheus(path: str = None) -> str:
+    """
+    Writes this process's records as a Prometheus textfile (node_exporter textfile collector):
+    per intent/lang/transport the sample count and the mean of each timing field, in seconds.
+    """
+    if not _RECORDS:
+        return None
+    groups = {}
+    for r in _RECORDS:
+        groups.setdefault((r["intent"], r["lang"], r["transport"] or "ui"), []).append(r)
+    lines = []
+    metrics = [(f, f"uask_prompt_{f[:-3]}_seconds", 1000.0) for f in FIELDS] + [("answer_chars", "uask_prompt_answer_chars", 1.0)]
+    for field, metric, scale in metrics:
+        lines += [f"# HELP {metric} Mean {field} per intent and language in the last run", f"# TYPE {metric} gauge"]
+        for (intent, lang, transport), rs in sorted(groups.items()):
+            vals = [r[field] for r in rs if r.get(field) is not None]
+            if vals:
+                labels = f'intent="{_esc(intent)}",lang="{_esc(lang)}",transport="{_esc(transport)}",worker="{_worker()}"'
+                lines.append(f"{metric}{{{labels}}} {sum(vals) / len(vals) / scale:.4f}")
+    lines += ["# HELP uask_prompt_samples Prompts timed per intent and language in the last run",
+              "# TYPE uask_prompt_samples gauge"]
+    for (intent, lang, transport), rs in sorted(groups.items()):
+        labels = f'intent="{_esc(intent)}",lang="{_esc(lang)}",transport="{_esc(transport)}",worker="{_worker()}"'
+        lines.append(f"uask_prompt_samples{{{labels}}} {len(rs)}")
+    lines += ["# HELP uask_prompt_timings_last_run_timestamp_seconds When the last run finished",
+              "# TYPE uask_prompt_timings_last_run_timestamp_seconds gauge",
+              f'uask_prompt_timings_last_run_timestamp_seconds{{worker="{_worker()}"}} {time.time():.0f}']
+
+    path = path or os.path.join(_dir(), f"uask_prompt_timings_{_worker()}.prom")
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+    os.replace(tmp, path)  # the collector must never read a half-written file
+    return path
+
+
+class TimedChat:
+    """
+    Wraps a chat transport and records the timing of every prompt it answers.
+    """
+
+    def __init__(self, inner, transport: str = None, baseline=None):
+        self.inner = inner
+        self.transport = transport
+        self.baseline = baseline  # perf_gate.Baseline: also attach the latency-vs-baseline check
+        self.page = getattr(inner, "page", None)
+        self.url = getattr(inner, "url", None)
+        self.last_timing = {}
+
+    def ask(self, prompt: str, intent: str = None, lang: str = None, raw: bool = False) -> str:
+        answer = self.inner.ask(prompt, intent=intent, lang=lang, raw=raw)
+        self.last_timing = dict(getattr(self.inner, "last_timing", {}) or {})
+        if self.last_timing.get("mode") != "replay":  # recorded timings say nothing about this run
+            rec = record_prompt(answer, self.last_timing, intent=intent, lang=lang, transport=self.transport)
+            if self.baseline is not None:
+                attach_prompt_check(rec, self.baseline)
+        return answer
@@ -7,41 +7,115 @@
 # lib/utils/reporting.py
 
 import os
-import time
+import gzip
+import queue
+import atexit
 import allure
+import threading
 import traceback
+from lib.utils.artifact_store import store
 
-def take_screenshot(page, name="screenshot"):
+# ---- Background artifact writer ----
+# Attachments are made from the in-memory bytes; copies on disk are written by a
+# bounded background queue so failure capture does not wait on file I/O.
+# ARTIFACT_QUEUE_MAX bounds memory (a full queue blocks the caller), ARTIFACT_GZIP_DOM=1
+# stores DOM snapshots as .html.gz.
+
+class _ArtifactWriter:
+    def __init__(self, maxsize: int):
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._thread = None
+        self._lock = threading.Lock()
+        self.written = 0
+        self.bytes = 0
+        self.errors = 0
+
+    def _run(self):
+        while True:
+            path, data, compress = self._queue.get()
+            try:
+                os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+                tmp = f"{path}.{os.getpid()}.tmp"
+                with (gzip.open(tmp, "wb", compresslevel=6) if compress else open(tmp, "wb")) as f:
+                    f.write(data)
+                os.replace(tmp, path)  # another worker may be storing the same object
+                self.written += 1
+                self.bytes += len(data)
+            except Exception as e:
+                self.errors += 1
+                print(f"[WARN] Could not write artifact {path}: {e}")
+            finally:
+                self._queue.task_done()
+
+    def submit(self, path: str, data: bytes, compress: bool = False) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True, name="artifact-writer")
+                self._thread.start()
+        self._queue.put((path, data, compress))
+
+    def flush(self) -> None:
+        if self._thread is not None:
+            self._queue.join()
+
+    def stats(self) -> dict:
+        return {"written": self.written, "bytes": self.bytes, "errors": self.errors, "pending": self._queue.qsize()}
+
+
+_writer = _ArtifactWriter(int(os.environ.get("ARTIFACT_QUEUE_MAX", "32")))
+atexit.register(_writer.flush)
+
+def flush_artifacts() -> dict:
     """
-    Takes a screenshot and attaches it to the Allure report.
+    Blocks until every queued artifact is on disk (called at session end); returns writer stats.
     """
-    timestamp = time.strftime("%Y%m%d_%H%M%S")
-    filename = f"{name}_{timestamp}.png"
-    filepath = os.path.join("reports", filename)
+    _writer.flush()
+    return _writer.stats()
 
-    page.screenshot(path=filepath)
+# ---- Content-addressed attachments ----
+# Every artifact goes to the artifact store once per distinct content. Content this
+# process has already attached in full, and larger than ARTIFACT_REF_MIN_BYTES
+# (default 1024), is attached as a short sha256 reference instead of a second copy.
 
-    with open(filepath, "rb") as f:
-        allure.attach(f.read(), name, allure.attachment_type.PNG)
+_attached = set()
 
-    return filepath
+def _current_test():
+    return os.environ.get("PYTEST_CURRENT_TEST", "").rsplit(" ", 1)[0] or None
+
+def _store_and_attach(data: bytes, name: str, attachment_type, ext: str, compress: bool = False, body=None) -> str:
+    sha, path, is_new = store().put(data, name, ext, test=_current_test())
+    if is_new:
+        _writer.submit(path, data, compress=compress)
+    if sha in _attached and len(data) >= int(os.environ.get("ARTIFACT_REF_MIN_BYTES", "1024")):
+        allure.attach(f"sha256:{sha}\n{path}", f"{name} (same as earlier attachment)", allure.attachment_type.URI_LIST)
+    else:
+        _attached.add(sha)
+        allure.attach(body if body is not None else data, name, attachment_type)
+    return path
+
+def take_screenshot(page, name="screenshot"):
+    """
+    Takes a screenshot and attaches it to the Allure report.
+    Returns the path of the stored copy (written in the background).
+    """
+    png = page.screenshot()
+    return _store_and_attach(png, name, allure.attachment_type.PNG, "png")
 
 def attach_dom(page, name="dom_snapshot"):
     """
     Captures the current DOM content and attaches it to Allure report.
+    Returns the path of the stored copy (written in the background).
     """
-    timestamp = time.strftime("%Y%m%d_%H%M%S")
-    filename = f"{name}_{timestamp}.html"
-    filepath = os.path.join("reports", filename)
-
+    compress = os.environ.get("ARTIFACT_GZIP_DOM", "0").strip().lower() in ("1", "true", "yes", "on")
     html = page.content()
-    with open(filepath, "w", encoding="utf-8") as f:
-        f.write(html)
-
-    with open(filepath, "r", encoding="utf-8") as f:
-        allure.attach(f.read(), name, allure.attachment_type.HTML)
+    return _store_and_attach(html.encode("utf-8"), name, allure.attachment_type.HTML,
+                             "html.gz" if compress else "html", compress=compress, body=html)
 
-    return filepath
+def attach_text(text: str, name: str) -> str:
+    """
+    Attaches a prompt / answer text, stored once however many tests attach it.
+    """
+    return _store_and_attach((text or "").encode("utf-8"), name, allure.attachment_type.TEXT, "txt", body=text)
 
 def attach_on_failure(item, page):
     """
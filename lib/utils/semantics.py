@@ -4,14 +4,326 @@
 # Unauthorized use, copying, or redistribution is prohibited.
 # =============================================================================    
 
-from sentence_transformers import SentenceTransformer, util
+import os
+import re
+import zlib
+import threading
+import numpy as np
 from functools import lru_cache
-@lru_cache(maxsize=2)
-def _model(name:str):
-    return SentenceTransformer(name)
+from concurrent.futures import ThreadPoolExecutor
+from lib.utils.embed_cache import EmbeddingCache
+
+MODEL_EN = "all-MiniLM-L6-v2"
+MODEL_XL = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
+
+
+# ---- Scorer backends ----
+# sentence_transformers/torch are only imported when a model is first needed,
+# so collecting test modules that import this file stays cheap.
+
+class SentenceTransformerBackend:
+    """
+    The MiniLM sentence-transformers models at full precision (default).
+    """
+    cacheable = True
+
+    def load(self, name:str):
+        from sentence_transformers import SentenceTransformer
+        return SentenceTransformer(name)
+
+    def encode(self, model, texts:list)->np.ndarray:
+        return model.encode(texts, convert_to_numpy=True, normalize_embeddings=True)
+
+    def dim(self, model)->int:
+        return model.get_sentence_embedding_dimension()
+
+
+class QuantizedBackend(SentenceTransformerBackend):
+    """
+    Same MiniLM models with int8 dynamic quantization of the Linear layers, CPU only.
+    """
+
+    def load(self, name:str):
+        import torch
+        from sentence_transformers import SentenceTransformer
+        model = SentenceTransformer(name, device="cpu")
+        return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+class NgramBackend:
+    """
+    Torch-free hashed character n-gram vectors with sublinear TF, for fast smoke runs.
+    No IDF: a text's vector must not depend on what else is in the batch, or a pair would
+    score differently in sim_en (2 texts) and in calibrate (whole corpus). Cheap enough
+    to recompute, so vectors are not cached.
+    """
+    cacheable = False
+    dims = 1 << 14
+    ngram_range = (2, 4)
+
+    def load(self, name:str):
+        return None
+
+    def dim(self, model)->int:
+        return self.dims
+
+    def _grams(self, text:str):
+        t = " " + " ".join(text.lower().split()) + " "
+        lo, hi = self.ngram_range
+        for n in range(lo, hi + 1):
+            for i in range(len(t) - n + 1):
+                yield zlib.crc32(t[i:i + n].encode("utf-8")) % self.dims
+
+    def encode(self, model, texts:list)->np.ndarray:
+        X = np.zeros((len(texts), self.dims), dtype=np.float32)
+        for row, text in enumerate(texts):
+            np.add.at(X[row], list(self._grams(text)) or [0], 1.0)
+        X = np.log1p(X)  # sublinear tf
+        norms = np.linalg.norm(X, axis=1, keepdims=True)
+        return X / np.maximum(norms, 1e-12)
+
+
+BACKENDS = {
+    "st": SentenceTransformerBackend,
+    "st-int8": QuantizedBackend,
+    "ngram": NgramBackend,
+}
+_backend = None
+
+def register_backend(name:str, cls)->None:
+    BACKENDS[name] = cls
+
+def set_backend(name:str)->None:
+    """
+    Selects the scorer backend by name (see BACKENDS).
+    """
+    global _backend
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown scorer backend '{name}'. Available: {', '.join(BACKENDS)}")
+    _backend = name
+
+def backend_name()->str:
+    return _backend or os.environ.get("SCORER_BACKEND", "st").strip() or "st"
+
+# How answers are scored against goldens: "whole" = one embedding per text (sim_en/sim_xl),
+# "sentence" = sentence-level alignment (align), which long answers do not dilute
+SCORING_MODES = ("whole", "sentence")
+_scoring = None
+
+def set_scoring_mode(name:str)->None:
+    global _scoring
+    if name not in SCORING_MODES:
+        raise ValueError(f"Unknown scoring mode '{name}'. Available: {', '.join(SCORING_MODES)}")
+    _scoring = name
+
+def scoring_mode()->str:
+    return _scoring or os.environ.get("SCORING_MODE", "whole").strip() or "whole"
+
+@lru_cache(maxsize=None)
+def _backend_instance(name:str):
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown scorer backend '{name}'. Available: {', '.join(BACKENDS)}")
+    return BACKENDS[name]()
+
+_loader = ThreadPoolExecutor(max_workers=2, thread_name_prefix="model-warmup")
+_loading = {}
+_loading_lock = threading.Lock()
+
+def _model_future(name:str, backend:str=None):
+    backend = backend or backend_name()
+    with _loading_lock:
+        if (backend, name) not in _loading:
+            _loading[(backend, name)] = _loader.submit(_backend_instance(backend).load, name)
+        return _loading[(backend, name)]
+
+def warm_up(names=(MODEL_EN, MODEL_XL))->None:
+    """
+    Starts loading the models on a background thread and returns immediately.
+    Nothing is loaded in-process when a shared embedding server is serving them.
+    """
+    if _use_server():
+        return
+    for name in names:
+        _model_future(name)
+
+def _model(name:str, backend:str=None):
+    # Blocks only while the model is still loading
+    return _model_future(name, backend).result()
+
+# ---- Shared embedding server (lib/utils/embed_server.py) ----
+_server_ok = None
+
+def _server_socket()->str:
+    return os.environ.get("EMBED_SERVER_SOCKET", "").strip()
+
+def _use_server()->bool:
+    global _server_ok
+    if _server_ok is None:
+        if not _server_socket() or not _backend_instance(backend_name()).cacheable:
+            return False
+        from lib.utils import embed_server
+        _server_ok = embed_server.ping(_server_socket())
+        if not _server_ok:
+            print(f"[INFO] Embedding server not reachable at {_server_socket()}; loading models in-process")
+    return _server_ok
+
+def _encode_batch(backend:str, name:str, texts:list):
+    global _server_ok
+    if _use_server():
+        from lib.utils import embed_server
+        try:
+            return embed_server.encode_remote(_server_socket(), backend, name, texts)
+        except (OSError, RuntimeError, ValueError) as e:
+            print(f"[WARN] Embedding server failed ({e}); falling back to in-process models")
+            _server_ok = False
+    return _backend_instance(backend).encode(_model(name, backend), texts)
+
+@lru_cache(maxsize=1)
+def _cache():
+    # EMBED_CACHE=0 turns the persistent embedding store off
+    if os.environ.get("EMBED_CACHE", "1").strip().lower() in ("0", "false", "no", "off"):
+        return None
+    return EmbeddingCache()
+
+def flush_cache()->None:
+    """
+    Writes pending embeddings of the persistent cache to disk now instead of at exit.
+    """
+    c = _cache()
+    if c is not None:
+        c.flush()
+
+def reset_cache()->None:
+    """
+    Drops this process's embedding store without writing it; the next lookup opens it again
+    from EMBED_CACHE / EMBED_CACHE_DIR as they are then.
+    """
+    _cache.cache_clear()
+
+def cache_stats()->dict:
+    """
+    Hit/miss counters of the persistent embedding cache for this process.
+    """
+    c = _cache()
+    return c.stats() if c else {"hits": 0, "misses": 0, "hit_rate": 0.0}
+
+def _model_name(lang:str)->str:
+    # English-only scoring uses the small EN model; anything else (ar, en↔ar) the multilingual one
+    return MODEL_EN if lang == "en" else MODEL_XL
+
+def encode(texts, lang:str="en")->dict:
+    """
+    Encodes every distinct text once, in a single batched forward pass.
+    Texts already in the persistent cache are not encoded again.
+    Returns {text: unit-length embedding}.
+    """
+    uniq = list(dict.fromkeys(texts))
+    if not uniq:
+        return {}
+    name = _model_name(lang)
+    backend = backend_name()
+    scorer = _backend_instance(backend)
+    cache = _cache() if scorer.cacheable else None
+    key = name if backend == "st" else f"{backend}:{name}"
+    found = cache.get_many(key, uniq) if cache else {}
+    missing = [t for t in uniq if t not in found]
+    if missing:
+        vecs = _encode_batch(backend, name, missing)
+        fresh = dict(zip(missing, np.asarray(vecs, dtype=np.float32)))
+        if cache:
+            cache.put_many(key, fresh)
+        found.update(fresh)
+    return found
+
+def sim_matrix(texts_a, texts_b, lang:str="en")->np.ndarray:
+    """
+    Cosine similarity of every text in texts_a against every text in texts_b.
+    Returns an array of shape (len(texts_a), len(texts_b)).
+    """
+    texts_a, texts_b = list(texts_a), list(texts_b)
+    if not texts_a or not texts_b:
+        return np.zeros((len(texts_a), len(texts_b)), dtype=np.float32)
+    emb = encode(texts_a + texts_b, lang)
+    A = np.stack([emb[t] for t in texts_a])
+    B = np.stack([emb[t] for t in texts_b])
+    return A @ B.T
+
+def sim_many(pairs, lang:str="en")->list:
+    """
+    Cosine similarity for a list of (a, b) pairs, scored in one batch.
+    """
+    pairs = list(pairs)
+    if not pairs:
+        return []
+    emb = encode([t for p in pairs for t in p], lang)
+    A = np.stack([emb[a] for a, _ in pairs])
+    B = np.stack([emb[b] for _, b in pairs])
+    return [float(s) for s in np.einsum("ij,ij->i", A, B)]
+
 def sim_en(a:str,b:str)->float:
-    m=_model("all-MiniLM-L6-v2")
-    return float(util.cos_sim(m.encode(a), m.encode(b)))
+    return sim_many([(a, b)], lang="en")[0]
 def sim_xl(a:str,b:str)->float:
-    m=_model("sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2")
-    return float(util.cos_sim(m.encode(a), m.encode(b)))
+    return sim_many([(a, b)], lang="xl")[0]
+
+def prime(texts, lang:str="en")->int:
+    """
+    Encodes texts that will be scored one pair at a time later (answers known before the tests
+    run) in one batch, their sentences too in sentence scoring mode, so each sim_*/align call
+    on them is an embedding cache lookup. Returns the number of distinct texts; 0 (and nothing
+    encoded) when the active backend's vectors are not cached.
+    """
+    if not _backend_instance(backend_name()).cacheable or _cache() is None:
+        return 0
+    texts = [t for t in texts if t]
+    if scoring_mode() == "sentence":
+        texts += [s for t in texts for s in split_sentences(t)]
+    return len(encode(texts, lang))
+
+
+# ---- Sentence-level alignment ----
+_SENTENCE_END = re.compile(r"(?<=[.!?؟])\s+|\s*\n+\s*")
+_ITEM_PREFIX = re.compile(r"^(?:[•\-–·*]+|\d+[.)])\s*")
+
+def split_sentences(text:str)->list:
+    """
+    Sentences and list items of a text; fragments without a letter (list numbers, emoji) are dropped.
+    """
+    out = []
+    for s in _SENTENCE_END.split(text or ""):
+        s = _ITEM_PREFIX.sub("", s.strip()).strip()
+        if re.search(r"[^\W\d_]", s):
+            out.append(s)
+    return out
+
+def align(answer:str, golden:str, lang:str="en", threshold:float=None)->dict:
+    """
+    Aligns the sentences of an answer with the sentences of its golden: both are encoded in one
+    batch and compared in one answer x golden cosine matrix.
+      coverage           share of golden sentences some answer sentence matches (>= threshold)
+      unsupported_ratio  share of answer sentences that match no golden sentence (hallucination signal)
+      recall/precision   mean best-match similarity per golden / per answer sentence; f1 combines them
+    threshold defaults to ALIGN_THRESHOLD (0.6).
+    """
+    thr = float(os.environ.get("ALIGN_THRESHOLD", "0.6")) if threshold is None else threshold
+    A, G = split_sentences(answer), split_sentences(golden)
+    report = {"threshold": thr, "answer_sentences": len(A), "golden_sentences": len(G)}
+    if not A or not G:
+        return {**report, "coverage": 0.0, "unsupported_ratio": 1.0 if A else 0.0, "recall": 0.0,
+                "precision": 0.0, "f1": 0.0, "uncovered": G, "unsupported": A, "best_match": [], "matrix": []}
+    emb = encode(A + G, lang)
+    M = np.stack([emb[s] for s in A]) @ np.stack([emb[s] for s in G]).T  # (|A|, |G|)
+    best_a, best_g = M.max(axis=0), M.max(axis=1)  # per golden sentence, per answer sentence
+    recall, precision = float(best_a.mean()), float(best_g.mean())
+    return {
+        **report,
+        "coverage": float((best_a >= thr).mean()),
+        "unsupported_ratio": float((best_g < thr).mean()),
+        "recall": recall,
+        "precision": precision,
+        "f1": 2 * recall * precision / (recall + precision) if recall + precision > 0 else 0.0,
+        "uncovered": [g for g, s in zip(G, best_a) if s < thr],
+        "unsupported": [a for a, s in zip(A, best_g) if s < thr],
+        "best_match": [{"golden": g, "answer": A[int(j)], "score": round(float(s), 3)}
+                       for g, j, s in zip(G, M.argmax(axis=0), best_a)],
+        "matrix": np.round(M, 3).tolist(),
+    }
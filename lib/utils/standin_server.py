@@ -0,0 +1,336 @@
+# ============================================================================= 
+# © 2025 [SapkalRohini77@gmail.com]. All rights reserved. 
+# This code is shared for evaluation purposes only with [NorthBay] 
+# Unauthorized use, copying, or redistribution is prohibited.
+# =============================================================================    
+
+# lib/utils/standin_server.py
+#
+# Local stand-in for the U-Ask app, for deterministic offline runs of the harness:
+#   python -m lib.utils.standin_server --port 8765 --latency-ms 300 --chunk-ms 40
+#   pytest --standin            (starts it in-process and points BASE_URL at it)
+# It mimics the contract the harness relies on: "Login using Credentials" ->
+# #email/#password/Sign in, a #chat-input composer, answers streamed into
+# #response-content-container after the real LOADING_MARKERS, and a Sources section.
+
+import os
+import json
+import time
+import random
+import secrets
+import argparse
+import threading
+import requests
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from http.cookies import SimpleCookie
+from lib.utils.chat import LOADING_MARKERS
+from lib.utils.dataset import load as load_dataset
+
+FALLBACK_EN = "I'm sorry, I'm not able to assist with your request. Please rephrase your question about UAE government services."
+FALLBACK_AR = "عذرًا، لم أفهم ذلك. هل يمكنك إعادة الصياغة أو توضيح ما تعنيه؟"
+BLOCKED = "I’m sorry, I can’t help with that request. Thank you for your understanding."
+SOURCES = [
+    {"title": "ICP Smart Services", "url": "https://icp.gov.ae/en/services"},
+    {"title": "GDRFA Dubai", "url": "https://gdrfad.gov.ae/en"},
+]
+
+_PAGE = """<!doctype html>
+<html lang="__LANG__" dir="__DIR__">
+<head><meta charset="utf-8"><title>U-Ask (stand-in)</title>
+<style>
+  body { font-family: sans-serif; margin: 0; display: flex; height: 100vh; }
+  #sidebar { width: 30%; border-right: 1px solid #ccc; }
+  #sidebar .pl-\\[8px\\] { padding-left: 8px; height: 100%; }
+  #main { flex: 1; display: flex; flex-direction: column; }
+  #conversation { flex: 1; overflow-y: auto; padding: 8px; }
+  #chat-input p { min-height: 1.5em; border: 1px solid #999; padding: 4px; margin: 0; }
+  .user-msg { color: #555; margin: 8px 0; }
+  #response-content-container { white-space: pre-wrap; margin: 8px 0; }
+</style></head>
+<body>
+__BODY__
+</body></html>"""
+
+_LOGIN_BODY = """
+<div id="main">
+  <button type="button" id="login-credentials" onclick="document.getElementById('login-form').style.display='block'">Login using Credentials</button>
+  <form id="login-form" style="display:none" onsubmit="return signIn(event)">
+    <input id="email" type="email" placeholder="Email">
+    <input id="password" type="password" placeholder="Password">
+    <button type="submit">Sign in</button>
+  </form>
+</div>
+<script>
+async function signIn(ev) {
+  ev.preventDefault();
+  const r = await fetch('/auth/login', {method: 'POST', headers: {'Content-Type': 'application/json'},
+    body: JSON.stringify({email: document.getElementById('email').value, password: document.getElementById('password').value})});
+  if (r.ok) { location.href = '/'; } else { alert('Invalid credentials'); }
+  return false;
+}
+</script>"""
+
+_CHAT_BODY = """
+<div id="sidebar"><div><div class="pl-[8px] overflow-y-auto">History</div></div></div>
+<div id="main">
+  <div id="conversation"></div>
+  <form id="composer-form" onsubmit="return sendPrompt(event)">
+    <div id="chat-input"><p contenteditable="true"></p></div>
+    <button type="submit">Send</button>
+  </form>
+</div>
+<script>
+async function sendPrompt(ev) {
+  ev.preventDefault();
+  const ed = document.querySelector('#chat-input p');
+  const prompt = ed.innerText.trim();
+  if (!prompt) { return false; }
+  ed.textContent = '';
+  const conv = document.getElementById('conversation');
+  const q = document.createElement('div'); q.className = 'user-msg'; q.textContent = prompt; conv.appendChild(q);
+  const box = document.createElement('div'); box.id = 'response-content-container'; conv.appendChild(box);
+  let answer = '', sources = [];
+  try {
+    const r = await fetch('/api/chat', {method: 'POST', headers: {'Content-Type': 'application/json'}, body: JSON.stringify({message: prompt})});
+    if (!r.ok) { box.textContent = 'Something went wrong (' + r.status + '). Please try again.'; return false; }
+    const reader = r.body.getReader(); const dec = new TextDecoder(); let buf = '';
+    while (true) {
+      const {value, done} = await reader.read();
+      if (done) { break; }
+      buf += dec.decode(value, {stream: true});
+      let i;
+      while ((i = buf.indexOf('\\n\\n')) >= 0) {
+        const line = buf.slice(0, i).replace(/^data:\\s*/, ''); buf = buf.slice(i + 2);
+        if (line === '[DONE]') { continue; }
+        const ev = JSON.parse(line);
+        if (ev.marker) { box.textContent = ev.marker; }
+        if (ev.delta) { answer += ev.delta; box.textContent = answer; }
+        if (ev.sources) { sources = ev.sources; }
+      }
+    }
+  } catch (e) {
+    box.textContent = answer || 'Something went wrong. Please try again.';
+  }
+  if (sources.length) {
+    const h = document.createElement('h4'); h.textContent = document.documentElement.lang === 'ar' ? 'المصادر' : 'Sources';
+    const ul = document.createElement('ul');
+    for (const s of sources) { const li = document.createElement('li'); li.textContent = s.title + ' - ' + s.url; ul.appendChild(li); }
+    box.appendChild(document.createElement('br')); box.appendChild(h); box.appendChild(ul);
+  }
+  return false;
+}
+</script>"""
+
+
+def _load_answers(data_path: str = None) -> dict:
+    try:
+        return {p["user"]: p for p in load_dataset(data_path).iter_cases() if p.get("user")}
+    except Exception:
+        return {}
+
+
+class StandinConfig:
+    """
+    Latency, streaming and failure-injection knobs (all times in ms).
+    """
+
+    def __init__(self, latency_ms=300, marker_ms=150, chunk_chars=24, chunk_ms=40,
+                 fail_rate=0.0, drop_rate=0.0, email="", password="", data_path=None, seed=None):
+        self.latency_ms = latency_ms
+        self.marker_ms = marker_ms
+        self.chunk_chars = chunk_chars
+        self.chunk_ms = chunk_ms
+        self.fail_rate = fail_rate
+        self.drop_rate = drop_rate
+        self.email = email
+        self.password = password
+        self.answers = _load_answers(data_path)
+        self.rng = random.Random(seed)
+
+    @classmethod
+    def from_env(cls, **overrides):
+        env = {
+            "latency_ms": float(os.environ.get("STANDIN_LATENCY_MS", 300)),
+            "marker_ms": float(os.environ.get("STANDIN_MARKER_MS", 150)),
+            "chunk_chars": int(os.environ.get("STANDIN_CHUNK_CHARS", 24)),
+            "chunk_ms": float(os.environ.get("STANDIN_CHUNK_MS", 40)),
+            "fail_rate": float(os.environ.get("STANDIN_FAIL_RATE", 0)),
+            "drop_rate": float(os.environ.get("STANDIN_DROP_RATE", 0)),
+        }
+        env.update({k: v for k, v in overrides.items() if v is not None})
+        return cls(**env)
+
+    def answer_for(self, prompt: str):
+        case = self.answers.get(prompt.strip())
+        if "<script" in prompt.lower():
+            return BLOCKED, []
+        if case:
+            return case.get("golden") or FALLBACK_EN, ([] if "fallback" in case.get("id", "") else SOURCES)
+        is_ar = any("؀" <= ch <= "ۿ" for ch in prompt)
+        return (FALLBACK_AR if is_ar else FALLBACK_EN), []
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "UAskStandin/1.0"
+
+    def log_message(self, fmt, *args):
+        pass  # keep pytest output clean
+
+    def _session(self) -> bool:
+        cookie = SimpleCookie(self.headers.get("Cookie", ""))
+        return "uask_session" in cookie and cookie["uask_session"].value in self.server.sessions
+
+    def _send(self, status: int, body: bytes, ctype: str, headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", ctype)
+        self.send_header("Content-Length", str(len(body)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path.split("?")[0] not in ("/", "/index.html"):
+            self._send(404, b"not found", "text/plain")
+            return
+        lang = "ar" if self.headers.get("Accept-Language", "").lower().startswith("ar") else "en"
+        body = (_PAGE.replace("__LANG__", lang).replace("__DIR__", "rtl" if lang == "ar" else "ltr")
+                .replace("__BODY__", _CHAT_BODY if self._session() else _LOGIN_BODY))
+        self._send(200, body.encode("utf-8"), "text/html; charset=utf-8")
+
+    def _json_body(self) -> dict:
+        n = int(self.headers.get("Content-Length", 0) or 0)
+        try:
+            return json.loads(self.rfile.read(n) or b"{}")
+        except ValueError:
+            return {}
+
+    def do_POST(self):
+        path = self.path.split("?")[0]
+        if path == "/auth/login":
+            return self._login(self._json_body())
+        if path == "/api/chat":
+            return self._chat(self._json_body())
+        self._send(404, b"not found", "text/plain")
+
+    def _login(self, req: dict):
+        cfg = self.server.cfg
+        ok = bool(req.get("email")) and (
+            not cfg.email or (req.get("email") == cfg.email and req.get("password") == cfg.password))
+        if not ok:
+            self._send(401, b'{"error": "invalid credentials"}', "application/json")
+            return
+        token = secrets.token_hex(16)
+        self.server.sessions.add(token)
+        self._send(200, b'{"ok": true}', "application/json",
+                   {"Set-Cookie": f"uask_session={token}; Path=/; HttpOnly; SameSite=Lax"})
+
+    def _event(self, obj) -> None:
+        data = obj if isinstance(obj, str) else json.dumps(obj, ensure_ascii=False)
+        self.wfile.write(f"data: {data}\n\n".encode("utf-8"))
+        self.wfile.flush()
+
+    def _chat(self, req: dict):
+        cfg = self.server.cfg
+        if not self._session():
+            self._send(401, b'{"error": "not logged in"}', "application/json")
+            return
+        if cfg.fail_rate and cfg.rng.random() < cfg.fail_rate:
+            time.sleep(cfg.latency_ms / 1000.0)
+            self._send(503, b'{"error": "injected failure"}', "application/json")
+            return
+        answer, sources = cfg.answer_for(req.get("message", ""))
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream; charset=utf-8")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        try:
+            time.sleep(cfg.latency_ms / 1000.0)
+            for marker in LOADING_MARKERS[:4]:
+                self._event({"marker": marker + "..."})
+                time.sleep(cfg.marker_ms / 1000.0)
+            drop_at = len(answer) // 2 if cfg.drop_rate and cfg.rng.random() < cfg.drop_rate else None
+            for i in range(0, len(answer), max(1, cfg.chunk_chars)):
+                if drop_at is not None and i >= drop_at:
+                    return  # injected mid-stream disconnect
+                self._event({"delta": answer[i:i + cfg.chunk_chars]})
+                time.sleep(cfg.chunk_ms / 1000.0)
+            if sources:
+                self._event({"sources": sources})
+            self._event("[DONE]")
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            self.close_connection = True
+
+
+class StandinServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, cfg: StandinConfig = None):
+        super().__init__((host, port), _Handler)
+        self.cfg = cfg or StandinConfig.from_env()
+        self.sessions = set()
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def start(self) -> "StandinServer":
+        """
+        Serves on a background thread (port 0 picks a free port; see .url).
+        """
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True, name="uask-standin")
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+    def login_cookies(self, email: str = "standin@example.com", password: str = "standin") -> list:
+        """
+        Logs in over HTTP (no browser) and returns the session cookie in storage-state form.
+        """
+        r = requests.post(self.url + "auth/login", json={"email": email, "password": password}, timeout=10)
+        r.raise_for_status()
+        host = self.server_address[0]
+        return [{"name": c.name, "value": c.value, "domain": host, "path": "/"} for c in r.cookies]
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Local stand-in for the U-Ask chatbot")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--latency-ms", type=float, help="delay before the first loading marker")
+    ap.add_argument("--marker-ms", type=float, help="time each loading marker stays on screen")
+    ap.add_argument("--chunk-chars", type=int, help="characters per streamed chunk")
+    ap.add_argument("--chunk-ms", type=float, help="delay between streamed chunks")
+    ap.add_argument("--fail-rate", type=float, help="share of chat requests answered with HTTP 503")
+    ap.add_argument("--drop-rate", type=float, help="share of streams cut off half-way")
+    ap.add_argument("--email", default=None, help="only accept this email (default: any)")
+    ap.add_argument("--password", default=None)
+    ap.add_argument("--data", dest="data_path", default=None, help="golden data used for canned answers")
+    ap.add_argument("--seed", type=int, default=None)
+    args = ap.parse_args(argv)
+
+    cfg = StandinConfig.from_env(
+        latency_ms=args.latency_ms, marker_ms=args.marker_ms, chunk_chars=args.chunk_chars, chunk_ms=args.chunk_ms,
+        fail_rate=args.fail_rate, drop_rate=args.drop_rate, email=args.email, password=args.password,
+        data_path=args.data_path, seed=args.seed,
+    )
+    server = StandinServer(args.host, args.port, cfg)
+    print(f"U-Ask stand-in listening on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -7,79 +7,17 @@
 import os, json, time, re, pytest, allure
 from playwright.sync_api import expect
 from lib.utils.semantics import sim_en, sim_xl
-from lib.utils.chat import _send_and_get_answer
-from lib.utils.common import _norm
-from lib.utils.reporting import take_screenshot, attach_dom
+from lib.utils.chat import _type_and_send, LOADING_MARKERS
+from lib.utils.common import _looks_clean, _links_are_gov_whitelisted
+from lib.utils.locators import TARGETS
+from lib.utils.dataset import load, base_id as _base_id
+from lib.utils.reporting import take_screenshot, attach_dom, attach_text
 
 
 # ---- Data ----------
-DATA = json.load(open("data/test-data.json", encoding="utf-8"))
+DATA = load()
+_pairs = DATA.pair_ids(DATA.select())
 
-_pairs = []
-_by_base = {}
-
-def _base_id(case_id: str) -> str:
-    return re.sub(r'_(en|ar)$', '', case_id or "")
-
-for p in DATA["prompts"]:
-    _by_base.setdefault(_base_id(p.get("id")), {}).update({p.get("lang"): p})
-for base, d in _by_base.items():
-    if "en" in d and "ar" in d:
-        _pairs.append((d["en"], d["ar"]))
-
-# ---- Shared helpers (local/lightweight; no cross-file deps) ----------
-LOADING_MARKERS = [
-    "Just a sec", "Scanning the Gov Knowledge Base",
-    "Retrieving the right documents", "Analyzing documents", "⏳", "📂", "📄", "🧠"
-]
-
-def _type_and_send(page, text: str):
-    ed = page.locator("//div[@id='chat-input']//p").first
-    expect(ed).to_be_visible(timeout=15000)
-    ed.click()
-    try:
-        ed.fill(text)
-    except Exception:
-        page.keyboard.type(text)
-    send_btn = page.locator("//button[@type='submit']").first
-    expect(send_btn).to_be_enabled()
-    send_btn.click()
-
-def _wait_for_final_response(page, timeout_ms: int = 120000) -> str:
-    container = page.locator("(//div[@id='response-content-container'])[last()]")
-    container.wait_for(state="visible", timeout=45000)
-    start = time.time(); last_txt=""; stable=0
-    while (time.time()-start)*1000 < timeout_ms:
-        txt = container.inner_text().strip()
-        if any(m in txt for m in LOADING_MARKERS) or len(txt) < 20:
-            page.wait_for_timeout(400); continue
-        if txt == last_txt: stable += 1
-        else: stable = 0; last_txt = txt
-        if stable >= 2: return txt
-        page.wait_for_timeout(400)
-    raise AssertionError(f"Timed out waiting final response. Last:\n{last_txt}")
-
-def _send(page, q: str) -> str:
-    _type_and_send(page, q)
-    return _wait_for_final_response(page)
-
-def _base_id(case_id: str) -> str:
-    return re.sub(r'_(en|ar)$', '', case_id or "")
-
-def _looks_clean(text: str) -> bool:
-    # Reject <script>/<style> and obviously broken tags (very light check)
-    if re.search(r"<\s*(script|style)\b", text, flags=re.I): return False
-    # tolerate self-closing tags and small mismatch
-    opens = re.findall(r"<([a-zA-Z]+)[^>/]*>", text)
-    closes = re.findall(r"</([a-zA-Z]+)\s*>", text)
-    for t in ["br","hr","img","input","meta","link"]:  # ignore self-closers
-        opens = [x for x in opens if x.lower() != t]
-    return len(closes) <= len(opens) + 2
-
-GOV_ALLOW = r"(gdrfad\.gov\.ae|icp\.gov\.ae|u\.ae|gov\.ae)"
-def _links_are_gov_whitelisted(ans: str) -> bool:
-    urls = re.findall(r"https?://[^\s)\]]+", ans)
-    return all(re.search(GOV_ALLOW, u, flags=re.I) for u in urls)
 # ---------------------------- Tests ----------------------------
 
 import allure  # Make sure this is imported if not already
@@ -93,14 +31,15 @@ import allure  # Make sure this is imported if not already
 **Objective:**  
 To verify that AI responses for the same user intent are consistent in both English and Arabic, by checking semantic similarity.
 """)
-@pytest.mark.parametrize("en_case,ar_case", _pairs)
-def test_intent_consistency_cross_lang(logged_in_page, en_case, ar_case):
-    page = logged_in_page
-    en_ans = _send(page, en_case["user"])
-    ar_ans = _send(page, ar_case["user"])
+@pytest.mark.parametrize("en_id,ar_id", _pairs)
+def test_intent_consistency_cross_lang(chat, en_id, ar_id):
+    page = chat.page  # None with --transport=api
+    en_case, ar_case = DATA.case(en_id), DATA.case(ar_id)
+    en_ans = chat.ask(en_case["user"], intent=en_case["id"], lang="en", raw=True)
+    ar_ans = chat.ask(ar_case["user"], intent=ar_case["id"], lang="ar", raw=True)
     score = sim_xl(en_ans, ar_ans)  # multilingual similarity
     allure.attach(f"{score:.3f}", f"en_ar_similarity::{_base_id(en_case['id'])}", allure.attachment_type.TEXT)
-    if score < 0.70:
+    if score < 0.70 and page:
         take_screenshot(page, f"fail_consistency_{_base_id(en_case['id'])}")
         attach_dom(page, f"dom_consistency_{_base_id(en_case['id'])}")
     assert score >= 0.70, f"EN–AR consistency too low ({score:.2f})"
@@ -114,11 +53,12 @@ def test_intent_consistency_cross_lang(logged_in_page, en_case, ar_case):
 **Objective:**  
 Ensure that appropriate loading indicators (e.g., 'Scanning', 'Analyzing documents', etc.) are shown while the AI is generating a response.
 """)
-@pytest.mark.parametrize("case", [c for c in DATA["prompts"] if c.get("lang")=="en"][:1])
-def test_loading_markers_appear(logged_in_page, case):
+@pytest.mark.parametrize("case_id", DATA.select(lang="en")[:1])
+def test_loading_markers_appear(logged_in_page, case_id):
+    case = DATA.case(case_id)
     page = logged_in_page
     _type_and_send(page, case["user"])
-    container = page.locator("(//div[@id='response-content-container'])[last()]")
+    container = page.locator(TARGETS["response"][0])
     container.wait_for(state="visible", timeout=45000)
     saw_loading = False
     for _ in range(30):
@@ -141,13 +81,14 @@ def test_loading_markers_appear(logged_in_page, case):
 **Objective:**  
 To verify that the generated responses do not contain broken HTML, unsafe scripts, or incomplete formatting that could impact UI rendering or security.
 """)
-@pytest.mark.parametrize("case", [c for c in DATA["prompts"] if c.get("lang")=="en"][:1])
-def test_response_format_is_clean(logged_in_page, case):
-    page = logged_in_page
-    ans = _send(page, case["user"])
+@pytest.mark.parametrize("case_id", DATA.select(lang="en")[:1])
+def test_response_format_is_clean(chat, case_id):
+    case = DATA.case(case_id)
+    page = chat.page
+    ans = chat.ask(case["user"], intent=case["id"], lang=case.get("lang"), raw=True)
     ok = _looks_clean(ans)
-    allure.attach(ans, "answer_text", allure.attachment_type.TEXT)
-    if not ok:
+    attach_text(ans, "answer_text")
+    if not ok and page:
         take_screenshot(page, "fail_format_clean")
         attach_dom(page, "dom_format_clean")
     assert ok, "Response contains unsafe/broken HTML/markup"
@@ -161,13 +102,14 @@ def test_response_format_is_clean(logged_in_page, case):
 **Objective:**  
 Ensure that any hyperlinks in AI-generated answers refer only to whitelisted and official government domains (e.g., gdrfad.gov.ae, icp.gov.ae), to avoid hallucination and misinformation.
 """)
-@pytest.mark.parametrize("case", [c for c in DATA["prompts"] if c.get("lang")=="en"][:1])
-def test_links_are_gov_whitelisted(logged_in_page, case):
-    page = logged_in_page
-    ans = _send(page, case["user"])
+@pytest.mark.parametrize("case_id", DATA.select(lang="en")[:1])
+def test_links_are_gov_whitelisted(chat, case_id):
+    case = DATA.case(case_id)
+    page = chat.page
+    ans = chat.ask(case["user"], intent=case["id"], lang=case.get("lang"), raw=True)
     ok = _links_are_gov_whitelisted(ans)
-    allure.attach(ans, "answer_text", allure.attachment_type.TEXT)
-    if not ok:
+    attach_text(ans, "answer_text")
+    if not ok and page:
         take_screenshot(page, "fail_link_whitelist")
         attach_dom(page, "dom_link_whitelist")
     assert ok, "Found non-gov links in answer"
@@ -182,18 +124,18 @@ Objective:
 To ensure that when a user provides an unclear or malformed query (e.g., gibberish or special characters), 
 the system responds with a proper fallback message such as 'Sorry, I didn’t catch that...'
 """)
-@pytest.mark.parametrize("case", [c for c in DATA["prompts"] if "fallback_test" in c.get("id", "")])
-def test_fallback_message_shown(logged_in_page, case):
-    page = logged_in_page
-    ans = _send(page, case["user"])
-    allure.attach(ans, "fallback_response", allure.attachment_type.TEXT)
+@pytest.mark.parametrize("case_id", DATA.select(tags="fallback"))
+def test_fallback_message_shown(chat, case_id):
+    case = DATA.case(case_id)
+    ans = chat.ask(case["user"], intent=case["id"], lang=case.get("lang"), raw=True)
+    attach_text(ans, "fallback_response")
 
     # Basic similarity check if golden present
     if "golden" in case:
-        score = sim_xl(ans, case["golden"])
+        score = DATA.golden_score(case, ans, "xl")
         allure.attach(f"{score:.3f}", f"sim_score::{case['id']}", allure.attachment_type.TEXT)
         assert score >= case.get("threshold", 0.80), f"Low similarity to golden fallback response ({score:.2f})"
 
     # Must contain certain key fallback phrases
-    missing_phrases = [kw for kw in case.get("must_contain", []) if kw.lower() not in ans.lower()]
+    missing_phrases = [kw for kw, spans in DATA.fact_hits(case, ans).items() if not spans]
     assert not missing_phrases, f"Missing fallback keywords: {missing_phrases}"
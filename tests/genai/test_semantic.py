@@ -7,19 +7,12 @@
 import json
 import pytest
 import allure
-from lib.utils.semantics import sim_en, sim_xl
-from lib.utils.chat import _send_and_get_answer
-from lib.utils.common import _norm
-from lib.utils.reporting import take_screenshot, attach_dom
+from lib.utils.semantics import sim_xl, scoring_mode
+from lib.utils.dataset import load
+from lib.utils.reporting import take_screenshot, attach_dom, attach_text
 
 
-@pytest.fixture(scope="session")
-def test_data():
-    try:
-        with open("data/test-data.json", encoding="utf-8") as f:
-            return json.load(f)
-    except Exception as e:
-        pytest.fail(f"Could not load test-data.json: {e}")
+DATA = load()
 
 
 # -------------------
@@ -38,21 +31,18 @@ Objective:
 To verify that for known English prompts, the AI gives accurate and relevant answers
 that match expected golden responses or contain required facts.
 """)
-@pytest.mark.parametrize("prompt_case", [
-    pytest.param(p, id=p.get("id", "case"))
-    for p in json.load(open("data/test-data.json", encoding="utf-8")).get("prompts", [])
-    if p.get("lang") == "en"
-])
-def test_semantic_en_accuracy(logged_in_page, prompt_case):
-    page = logged_in_page
-    p = prompt_case
-    prompt = p.get("user") or p.get("prompt", "")
+@pytest.mark.parametrize("case_id", DATA.select(lang="en"))
+def test_semantic_en_accuracy(chat, case_id):
+    page = chat.page  # None with --transport=api
+    p = DATA.case(case_id)
+    prompt = p["user"]
     golden = (p.get("golden") or "").strip()
-    ans = _send_and_get_answer(page, prompt)
-    facts = [f.lower() for f in p.get("must_contain", [])]
+    ans = chat.ask(prompt, intent=p.get("id"), lang="en")
+    facts = p.get("must_contain", [])
 
-    score = sim_en(ans, golden) if golden else None
-    hits = sum(1 for f in facts if f in _norm(ans)) if facts else 0
+    alignment = DATA.golden_alignment(p, ans, "en") if golden and scoring_mode() == "sentence" else None
+    score = alignment["recall"] if alignment else (DATA.golden_score(p, ans, "en") if golden else None)
+    hits = sum(1 for spans in DATA.fact_hits(p, ans).values() if spans)
     needed = max(1, min(2, len(facts))) if facts else 0
 
     if golden:
@@ -62,13 +52,16 @@ def test_semantic_en_accuracy(logged_in_page, prompt_case):
         ok = (len(ans.strip()) > 50) and (hits >= needed)
 
     # Reporting to Allure
-    allure.attach(prompt, f"prompt::{p.get('id','case')}", allure.attachment_type.TEXT)
-    allure.attach(ans, f"app_answer::{p.get('id','case')}", allure.attachment_type.TEXT)
+    attach_text(prompt, f"prompt::{p.get('id','case')}")
+    attach_text(ans, f"app_answer::{p.get('id','case')}")
     if golden:
-        allure.attach(golden, f"golden::{p.get('id','case')}", allure.attachment_type.TEXT)
+        attach_text(golden, f"golden::{p.get('id','case')}")
         allure.attach(f"{score:.3f}", f"sim_en::{p.get('id','case')}", allure.attachment_type.TEXT)
+        if alignment:
+            allure.attach(json.dumps(alignment, ensure_ascii=False, indent=2),
+                          f"sentence_alignment::{p.get('id','case')}", allure.attachment_type.JSON)
 
-    if not ok:
+    if not ok and page:
         take_screenshot(page, f"fail_{p.get('id','case')}")
         attach_dom(page, f"dom_fail_{p.get('id','case')}")
 
@@ -88,33 +81,28 @@ Objective:
 To ensure the AI provides consistent answers when asked similar questions
 in English and Arabic, maintaining intent and meaning.
 """)
-@pytest.mark.parametrize("pair", [
-    pytest.param((en, ar), id=f"{en.get('id')}↔{ar.get('id')}")
-    for en, ar in zip(
-        [p for p in json.load(open("data/test-data.json", encoding="utf-8")).get("prompts", []) if p.get("lang") == "en"],
-        [p for p in json.load(open("data/test-data.json", encoding="utf-8")).get("prompts", []) if p.get("lang") == "ar"]
-    )
-])
-def test_semantic_en_ar_consistency(logged_in_page, pair):
-    page = logged_in_page
-    e, a = pair
+# pairs by base id (faq_visa_en <-> faq_visa_ar), not by position in the file
+@pytest.mark.parametrize("pair", [pytest.param(pair, id="↔".join(pair)) for pair in DATA.pair_ids(DATA.select())])
+def test_semantic_en_ar_consistency(chat, pair):
+    page = chat.page  # None with --transport=api
+    e, a = (DATA.case(i) for i in pair)
     prompt_en = e["user"]
     prompt_ar = a["user"]
 
-    ans_en = _send_and_get_answer(page, prompt_en)
-    ans_ar = _send_and_get_answer(page, prompt_ar)
+    ans_en = chat.ask(prompt_en, intent=e["id"], lang="en")
+    ans_ar = chat.ask(prompt_ar, intent=a["id"], lang="ar")
 
     score = sim_xl(ans_en, ans_ar)
     thr = max(e.get("xl_threshold", 0.80), a.get("xl_threshold", 0.80))
 
     # Reporting
-    allure.attach(prompt_en, f"prompt_en::{e['id']}", allure.attachment_type.TEXT)
-    allure.attach(prompt_ar, f"prompt_ar::{a['id']}", allure.attachment_type.TEXT)
-    allure.attach(ans_en, f"answer_en::{e['id']}", allure.attachment_type.TEXT)
-    allure.attach(ans_ar, f"answer_ar::{a['id']}", allure.attachment_type.TEXT)
+    attach_text(prompt_en, f"prompt_en::{e['id']}")
+    attach_text(prompt_ar, f"prompt_ar::{a['id']}")
+    attach_text(ans_en, f"answer_en::{e['id']}")
+    attach_text(ans_ar, f"answer_ar::{a['id']}")
     allure.attach(f"{score:.3f}", f"sim_xl::{e['id']}::{a['id']}", allure.attachment_type.TEXT)
 
-    if score < thr:
+    if score < thr and page:
         take_screenshot(page, f"fail_consistency_{e['id']}_{a['id']}")
         attach_dom(page, f"dom_consistency_{e['id']}_{a['id']}")
 
@@ -5,16 +5,13 @@
 # =============================================================================    
 
 from playwright.sync_api import expect
+from lib.utils.chat import _type_and_send
+from lib.utils.locators import resolve
 
 
 
-def _composer(page): return page.locator("//div[@id='chat-input']//p").first
-def _send(page, text):
-    ed=_composer(page); expect(ed).to_be_visible(timeout=15000); ed.click()
-    try: ed.fill(text)
-    except Exception: page.keyboard.type(text)
-    send_btn = page.locator("//button[@type='submit']").first
-    expect(send_btn).to_be_enabled(); send_btn.click()
+def _composer(page): return resolve(page, "composer")
+def _send(page, text): _type_and_send(page, text)
     
 def test_chat_input_xss_blocked(logged_in_page):
     page = logged_in_page
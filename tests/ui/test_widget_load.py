@@ -5,15 +5,12 @@
 # =============================================================================    
 
 from playwright.sync_api import expect
+from lib.utils.chat import _type_and_send
+from lib.utils.locators import TARGETS, resolve
 import allure
 
-def _composer(page): return page.locator("//div[@id='chat-input']//p").first
-def _send(page, text):
-    ed=_composer(page); expect(ed).to_be_visible(timeout=15000); ed.click()
-    try: ed.fill(text)
-    except Exception: page.keyboard.type(text)
-    send_btn = page.locator("//button[@type='submit']").first
-    expect(send_btn).to_be_enabled(); send_btn.click()
+def _composer(page): return resolve(page, "composer")
+def _send(page, text): _type_and_send(page, text)
 
 @allure.epic("Chatbot UI Behavior")
 @allure.feature("Chat Widget Loading")
@@ -44,7 +41,7 @@ Covers:
 def test_send_and_render(logged_in_page):
     page = logged_in_page
     _send(page, "Hello from Playwright!")
-    resp = page.locator("(//div[@id='response-content-container'])[last()]")
+    resp = page.locator(TARGETS["response"][0])
     expect(resp).to_be_visible(timeout=45000)
 
 
@@ -93,7 +90,7 @@ Covers:
 def test_scroll_area_present(logged_in_page):
     page = logged_in_page
     _send(page, "UAE Government Visa details")
-    resp = page.locator("(//div[@id='response-content-container'])[last()]")
+    resp = page.locator(TARGETS["response"][0])
     expect(resp).to_be_visible(timeout=45000)
     wrap = page.locator("(//div[@id='sidebar']/div/div[contains(@class, 'pl-[8px]') and contains(@class, 'overflow-y-auto')]")
     expect(wrap).to_be_visible(timeout=65000)
\ No newline at end of file
@@ -0,0 +1,39 @@
+# ============================================================================= 
+# © 2025 [SapkalRohini77@gmail.com]. All rights reserved. 
+# This code is shared for evaluation purposes only with [NorthBay] 
+# Unauthorized use, copying, or redistribution is prohibited.
+# =============================================================================    
+
+import os
+import subprocess
+from lib.utils.artifact_store import prune_loose_files
+
+
+def _file(path, age_days):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as f:
+        f.write("x")
+    t = os.path.getmtime(path) - age_days * 86400
+    os.utime(path, (t, t))
+
+
+def test_prune_only_touches_legacy_artifacts(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    old = ["reports/FAILED_test_x_20250101.png", "reports/DOM_test_x_20250101.html", "reports/allure-results/a-result.json"]
+    kept = ["reports/calibration_20250101.json", "reports/notes.txt", "reports/FAILED_test_y_new.png"]
+    for p in old + kept[:2]:
+        _file(p, 30)
+    _file(kept[2], 1)
+    assert prune_loose_files(14) == 3
+    assert not any(os.path.exists(p) for p in old)
+    assert all(os.path.exists(p) for p in kept)
+
+
+def test_prune_keeps_git_tracked_files(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    subprocess.run(["git", "init", "-q"], check=True)
+    _file("reports/FAILED_tracked.png", 30)
+    _file("reports/FAILED_loose.png", 30)
+    subprocess.run(["git", "add", "reports/FAILED_tracked.png"], check=True)
+    assert prune_loose_files(14) == 1
+    assert os.path.exists("reports/FAILED_tracked.png") and not os.path.exists("reports/FAILED_loose.png")
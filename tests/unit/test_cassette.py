@@ -0,0 +1,66 @@
+# ============================================================================= 
+# © 2025 [SapkalRohini77@gmail.com]. All rights reserved. 
+# This code is shared for evaluation purposes only with [NorthBay] 
+# Unauthorized use, copying, or redistribution is prohibited.
+# =============================================================================    
+
+import json
+import pytest
+from lib.utils.cassette import AnswerCassette
+
+RAW = "Renew your Emirates ID online.\nSources\nhttps://icp.gov.ae"
+
+
+class _Transport:
+    """Stands in for UiChat / ChatApiClient: answers with or without the Sources section."""
+
+    def __init__(self):
+        self.last_timing = {"final_stable_ms": 1200}
+
+    def ask(self, prompt, intent=None, lang=None, raw=False):
+        return RAW if raw else RAW.split("\nSources")[0]
+
+
+def _record(path, *requests):
+    rec = AnswerCassette(str(path), "record", inner=_Transport())
+    for prompt, lang, raw in requests:
+        rec.ask(prompt, intent="eid", lang=lang, raw=raw)
+
+
+def test_replay_keeps_raw_and_plain_recordings_apart(tmp_path):
+    path = tmp_path / "answers.jsonl"
+    _record(path, ("renew eid", "en", False), ("renew eid", "en", True))
+    tape = AnswerCassette(str(path), "replay")
+    assert tape.ask("renew eid", lang="en", raw=True) == RAW
+    assert tape.ask("renew eid", lang="en") == "Renew your Emirates ID online."
+    assert tape.last_timing == {"final_stable_ms": 1200, "mode": "replay"}
+
+
+def test_plain_request_strips_a_raw_recording(tmp_path):
+    path = tmp_path / "answers.jsonl"
+    _record(path, ("renew eid", "en", True))
+    assert AnswerCassette(str(path), "replay").ask("renew eid", lang="en") == "Renew your Emirates ID online."
+
+
+def test_raw_request_never_gets_a_stripped_recording(tmp_path):
+    path = tmp_path / "answers.jsonl"
+    _record(path, ("renew eid", "en", False))
+    with pytest.raises(AssertionError, match="raw=True"):
+        AnswerCassette(str(path), "replay").ask("renew eid", lang="en", raw=True)
+
+
+def test_latest_recording_wins_and_other_language_is_last_resort(tmp_path):
+    path = tmp_path / "answers.jsonl"
+    with open(path, "w", encoding="utf-8") as f:
+        for answer in ("old", "new"):
+            f.write(json.dumps({"prompt": "hours", "lang": "en", "raw": False, "answer": answer}) + "\n")
+    tape = AnswerCassette(str(path), "replay")
+    assert tape.ask("hours", lang="en") == "new"
+    assert tape.ask("hours", lang="ar") == "new"
+    with pytest.raises(AssertionError):
+        tape.ask("unknown prompt", lang="en")
+
+
+def test_replay_without_cassette_fails_clearly(tmp_path):
+    with pytest.raises(FileNotFoundError, match="--answers=record"):
+        AnswerCassette(str(tmp_path / "missing.jsonl"), "replay")
@@ -0,0 +1,37 @@
+# ============================================================================= 
+# © 2025 [SapkalRohini77@gmail.com]. All rights reserved. 
+# This code is shared for evaluation purposes only with [NorthBay] 
+# Unauthorized use, copying, or redistribution is prohibited.
+# =============================================================================    
+
+import json
+from lib.utils.chat import parse_chat_payload
+
+
+def test_single_json_document():
+    body = json.dumps({"answer": "Visit an ICP centre.", "sources": [{"url": "https://icp.gov.ae"}, "https://u.ae"]})
+    assert parse_chat_payload(body) == ("Visit an ICP centre.", ["https://icp.gov.ae", "https://u.ae"])
+
+
+def test_sse_stream_joins_chunks_and_skips_control_lines():
+    body = (": keep-alive\n\nevent: message\nid: 1\ndata: {\"delta\": \"Renew \"}\n\n"
+            "data: {\"delta\": \"online.\"}\n\nretry: 1000\ndata: {\"citations\": [{\"title\": \"ICP\"}]}\n\n"
+            "data: [DONE]\n\n")
+    assert parse_chat_payload(body) == ("Renew online.", ["ICP"])
+
+
+def test_openai_style_and_ndjson_chunks():
+    lines = [{"choices": [{"delta": {"content": "مرحبا "}}]}, {"choices": [{"delta": {"content": "بك"}}]},
+             {"choices": [{"delta": {}}]}]
+    body = "\n".join(json.dumps(c, ensure_ascii=False) for c in lines)
+    assert parse_chat_payload(body) == ("مرحبا بك", [])
+
+
+def test_plain_text_chunks_and_duplicate_sources():
+    body = ('data: {"text": "Fee is "}\ndata: 200 AED\n'
+            'data: {"references": ["https://u.ae"]}\ndata: {"references": ["https://u.ae"]}\n')
+    assert parse_chat_payload(body) == ("Fee is 200 AED", ["https://u.ae"])
+
+
+def test_empty_body():
+    assert parse_chat_payload("") == ("", [])
@@ -0,0 +1,98 @@
+# ============================================================================= 
+# © 2025 [SapkalRohini77@gmail.com]. All rights reserved. 
+# This code is shared for evaluation purposes only with [NorthBay] 
+# Unauthorized use, copying, or redistribution is prohibited.
+# =============================================================================    
+
+import os
+import json
+import pytest
+from lib.utils.dataset import Dataset, ShardedDataset, write_sharded, convert, load, base_id
+
+
+def _case(cid, service="visa", tags=("faq",), **extra):
+    return {"id": cid, "lang": cid.rsplit("_", 1)[1], "user": f"question {cid}", "service": service,
+            "tags": list(tags), "golden": f"answer {cid}", **extra}
+
+
+CASES = [
+    _case("visa_fee_en"), _case("visa_fee_ar"),
+    _case("visa_renew_en", tags=("faq", "smoke")), _case("visa_renew_ar", tags=("faq", "smoke")),
+    _case("eid_lost_en", service="emirates_id"), _case("eid_lost_ar", service="emirates_id"),
+    _case("eid_hours_en", service="emirates_id", tags=("smoke",)),
+    _case("fallback_test_en", service="general", tags=("fallback", "negative")),
+]
+
+
+@pytest.fixture(autouse=True)
+def _no_session_selection(monkeypatch):
+    for name in ("DATA_TAGS", "DATA_SERVICE", "DATA_SAMPLE", "DATA_SEED"):
+        monkeypatch.delenv(name, raising=False)
+
+
+@pytest.fixture(params=["json", "sharded"])
+def ds(request, tmp_path):
+    if request.param == "json":
+        return Dataset(CASES)
+    write_sharded(CASES, str(tmp_path / "golden"), shard_size=3)
+    return ShardedDataset(str(tmp_path / "golden"))
+
+
+def test_select_filters_by_lang_service_and_tags(ds):
+    assert ds.select(lang="ar", service="emirates_id") == ["eid_lost_ar"]
+    assert ds.select(tags="smoke") == ["visa_renew_en", "visa_renew_ar", "eid_hours_en"]
+    assert ds.select(lang="en", tags="fallback,smoke") == ["visa_renew_en", "eid_hours_en", "fallback_test_en"]
+    assert len(ds.select()) == len(CASES)
+
+
+def test_explicit_tags_narrow_the_session_tags(ds, monkeypatch):
+    monkeypatch.setenv("DATA_TAGS", "smoke")
+    assert ds.select() == ["visa_renew_en", "visa_renew_ar", "eid_hours_en"]
+    assert ds.select(tags="faq") == ["visa_renew_en", "visa_renew_ar"]
+    assert ds.select(tags="fallback") == []
+    monkeypatch.setenv("DATA_SERVICE", "emirates_id")
+    assert ds.select(service="visa") == ["visa_renew_en", "visa_renew_ar"]  # service still replaces
+
+
+def test_sample_keeps_variants_together_and_is_seeded(ds):
+    picked = ds.select(sample=2, seed=7)
+    assert len({base_id(c) for c in picked}) == 2
+    assert all(base_id(c) + "_ar" in picked for c in picked if c.endswith("_en") and base_id(c) + "_ar" in ds)
+    assert picked == ds.select(sample=2, seed=7)
+    assert ds.select(sample=100) == ds.select()
+
+
+def test_pairs_and_case_access(ds):
+    assert ds.pair_ids() == [("visa_fee_en", "visa_fee_ar"), ("visa_renew_en", "visa_renew_ar"),
+                             ("eid_lost_en", "eid_lost_ar")]
+    assert ds.pair_ids(ds.select(lang="en")) == []
+    assert ds.case("eid_lost_ar")["user"] == "question eid_lost_ar"
+    ids = ["fallback_test_en", "visa_fee_ar", "eid_lost_en"]
+    assert {c["id"] for c in ds.iter_cases(ids)} == set(ids)
+
+
+def test_sharded_layout_and_conversion(tmp_path):
+    src = tmp_path / "test-data.json"
+    src.write_text(json.dumps({"prompts": CASES}, ensure_ascii=False), encoding="utf-8")
+    out = tmp_path / "golden"
+    assert convert(str(src), str(out), shard_size=3) == {"path": str(out), "shards": 3, "cases": len(CASES)}
+    assert sorted(os.listdir(out)) == ["index.json", "shard-00000.jsonl", "shard-00001.jsonl", "shard-00002.jsonl"]
+    # a smaller dataset written over it leaves no stale shards behind
+    write_sharded(CASES[:2], str(out), shard_size=3)
+    assert sorted(os.listdir(out)) == ["index.json", "shard-00000.jsonl"]
+    assert load(str(out)).ids() == ["visa_fee_en", "visa_fee_ar"]
+
+
+def test_invalid_cases_are_listed_and_nothing_is_replaced(tmp_path):
+    out = tmp_path / "golden"
+    write_sharded(CASES, str(out))
+    bad = CASES + [{"id": "visa_fee_en", "lang": "fr", "user": "x", "must_contain": [""]}]
+    with pytest.raises(ValueError) as e:
+        write_sharded(bad, str(out))
+    msg = str(e.value)
+    assert "duplicate id" in msg and "lang must be one of" in msg and "must_contain" in msg
+    assert ShardedDataset(str(out)).ids() == [c["id"] for c in CASES]
+    empty = tmp_path / "empty.json"
+    empty.write_text('{"prompts": []}', encoding="utf-8")
+    with pytest.raises(ValueError, match="non-empty"):
+        load(str(empty))
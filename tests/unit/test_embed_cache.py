@@ -0,0 +1,82 @@
+# ============================================================================= 
+# © 2025 [SapkalRohini77@gmail.com]. All rights reserved. 
+# This code is shared for evaluation purposes only with [NorthBay] 
+# Unauthorized use, copying, or redistribution is prohibited.
+# =============================================================================    
+
+import os
+import time
+import multiprocessing
+import numpy as np
+from lib.utils.embed_cache import EmbeddingCache
+
+MODEL = "test-model"
+
+
+def _vec(i: int):
+    v = np.zeros(8, dtype=np.float32)
+    v[i % 8] = 1.0
+    v[0] += i  # unique per text
+    return v
+
+def _worker(root: str, worker: int, n: int, flushes: int):
+    cache = EmbeddingCache(root, max_entries=100000)
+    step = n // flushes
+    for start in range(0, n, step):
+        cache.put_many(MODEL, {f"w{worker}-{i}": _vec(i) for i in range(start, start + step)})
+        cache.flush()
+
+
+def test_put_flush_reload(tmp_path):
+    cache = EmbeddingCache(str(tmp_path), max_entries=10)
+    cache.put_many(MODEL, {"a": _vec(1), "b": _vec(2)})
+    cache.flush()
+    again = EmbeddingCache(str(tmp_path), max_entries=10)
+    found = again.get_many(MODEL, ["a", "b", "c"])
+    assert set(found) == {"a", "b"}
+    assert np.array_equal(found["b"], _vec(2))
+    assert again.stats()["hits"] == 2 and again.stats()["misses"] == 1
+
+
+def test_eviction_keeps_most_recently_used(tmp_path):
+    cache = EmbeddingCache(str(tmp_path), max_entries=3)
+    for i in range(5):
+        cache.put_many(MODEL, {f"t{i}": _vec(i)})
+        cache.flush()
+    found = EmbeddingCache(str(tmp_path), max_entries=3).get_many(MODEL, [f"t{i}" for i in range(5)])
+    assert set(found) == {"t2", "t3", "t4"}
+
+
+def test_read_only_run_keeps_vectors_and_refreshes_last_used(tmp_path):
+    cache = EmbeddingCache(str(tmp_path), max_entries=3)
+    for i in range(3):
+        cache.put_many(MODEL, {f"t{i}": _vec(i)})
+        cache.flush()
+    store = os.path.join(str(tmp_path), MODEL)
+    before = [n for n in os.listdir(store) if n.startswith("vectors-")]
+    time.sleep(0.01)
+    reader = EmbeddingCache(str(tmp_path), max_entries=3)
+    assert set(reader.get_many(MODEL, ["t0"])) == {"t0"}
+    reader.flush()
+    assert [n for n in os.listdir(store) if n.startswith("vectors-")] == before
+    # t0 was used last, so the next insert evicts t1 instead
+    writer = EmbeddingCache(str(tmp_path), max_entries=3)
+    writer.put_many(MODEL, {"t3": _vec(3)})
+    writer.flush()
+    found = EmbeddingCache(str(tmp_path), max_entries=3).get_many(MODEL, [f"t{i}" for i in range(4)])
+    assert set(found) == {"t0", "t2", "t3"}
+
+
+def test_concurrent_flushes_lose_nothing(tmp_path):
+    workers, n = 4, 2000
+    ctx = multiprocessing.get_context("fork")
+    procs = [ctx.Process(target=_worker, args=(str(tmp_path), w, n, 40)) for w in range(workers)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join(120)
+        assert p.exitcode == 0
+    keys = [f"w{w}-{i}" for w in range(workers) for i in range(n)]
+    found = EmbeddingCache(str(tmp_path)).get_many(MODEL, keys)
+    assert len(found) == workers * n
+    assert np.array_equal(found["w3-1999"], _vec(1999))
@@ -0,0 +1,64 @@
+# ============================================================================= 
+# © 2025 [SapkalRohini77@gmail.com]. All rights reserved. 
+# This code is shared for evaluation purposes only with [NorthBay] 
+# Unauthorized use, copying, or redistribution is prohibited.
+# =============================================================================    
+
+import random
+from lib.utils.facts import fold, FactMatcher
+
+
+def test_fold_normalizes_case_spacing_and_arabic_variants():
+    assert fold("  Visa\t•  FEES ")[0] == "visa fees"
+    assert fold("إقامة")[0] == fold("اقامه")[0]
+    assert fold("مُسْتَشْفَى")[0] == "مستشفي"  # harakat dropped, alef maqsura -> yaa
+    assert fold("الـــهوية")[0] == "الهويه"  # tatweel
+    assert fold("٣٠ درهم")[0] == "30 درهم"
+    assert fold("")[0] == "" and fold(None)[0] == ""
+
+
+def test_fold_maps_every_character_back_to_the_original():
+    text = "Fee:  ٢٠٠ درهمًا — pay online"
+    folded, where = fold(text)
+    assert len(folded) == len(where)
+    assert all(where[i] < where[i + 1] for i in range(len(where) - 1))
+    for ch, i in zip(folded, where):
+        assert ch == " " or ch in fold(text[i])[0]
+
+
+def test_hits_are_original_spans():
+    m = FactMatcher(["200 AED", "إعادة الصياغة"])
+    text = "The fee is ٢٠٠  aed. يرجى اعادة الصياغه"
+    found = m.hits(text, ["200 AED", "إعادة الصياغة", "missing"])
+    (s, e), = found["200 AED"]
+    assert text[s:e] == "٢٠٠  aed"
+    (s, e), = found["إعادة الصياغة"]
+    assert text[s:e] == "اعادة الصياغه"
+    assert found["missing"] == []
+    assert "200 aed" in m and "missing" not in m and len(m) == 2
+
+
+def test_overlapping_and_nested_facts_all_hit():
+    m = FactMatcher(["he", "she", "his", "hers"])
+    assert {f: len(v) for f, v in m.find("ushers and his").items()} == {"she": 1, "he": 1, "hers": 1, "his": 1}
+
+
+def test_whole_words_rejects_hits_inside_words():
+    m = FactMatcher(["rephrase", "عذرا"])
+    assert m.find("Please rephrased it", whole_words=True) == {}
+    assert set(m.find("Please rephrase, عذرًا.", whole_words=True)) == {"rephrase", "عذرا"}
+    assert "rephrase" in m.find("Please rephrased it")
+
+
+def test_matches_brute_force_on_random_text():
+    rng = random.Random(3)
+    alphabet = "abc "
+    facts = sorted({"".join(rng.choice("abc") for _ in range(rng.randint(1, 4))) for _ in range(30)})
+    m = FactMatcher(facts)
+    for _ in range(200):
+        text = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 40)))
+        folded, where = fold(text)
+        expected = {f: [(where[i], where[i + len(f) - 1] + 1) for i in range(len(folded)) if folded.startswith(f, i)]
+                    for f in facts}
+        got = m.find(text)
+        assert {f: v for f, v in expected.items() if v} == got
@@ -0,0 +1,73 @@
+# ============================================================================= 
+# © 2025 [SapkalRohini77@gmail.com]. All rights reserved. 
+# This code is shared for evaluation purposes only with [NorthBay] 
+# Unauthorized use, copying, or redistribution is prohibited.
+# =============================================================================    
+
+import json
+from lib.utils.perf_gate import Baseline, percentile, summarize, compare, run_gate, write_allure_result
+
+
+def _rec(ms, intent="faq_visa", lang="en", transport="ui", ttfc=None, chars=300, mode="ui"):
+    return {"intent": intent, "lang": lang, "transport": transport, "mode": mode,
+            "final_stable_ms": ms, "first_content_ms": ttfc, "answer_chars": chars}
+
+
+def test_percentile_nearest_rank():
+    assert percentile([], 50) is None
+    assert percentile([5, 1, 3], 50) == 3
+    assert percentile(list(range(1, 101)), 95) == 95
+
+
+def test_summarize_groups_by_intent_lang_and_transport():
+    s = summarize([_rec(100), _rec(300), _rec(1000, transport="api"), _rec(50, lang="ar")])
+    assert set(s) == {"faq_visa|en|ui", "faq_visa|en|api", "faq_visa|ar|ui"}
+    assert s["faq_visa|en|ui"]["samples"] == 2 and s["faq_visa|en|ui"]["p50_ms"] == 100
+    assert s["faq_visa|en|api"]["p95_ms"] == 1000
+
+
+def test_compare_flags_slowdown_and_length_change():
+    base = summarize([_rec(1000)] * 5)
+    rows = compare(summarize([_rec(1400, chars=100)] * 5), base, tolerance=0.25, length_tolerance=0.5, min_samples=3)
+    verdicts = {r["metric"]: r["verdict"] for r in rows}
+    assert verdicts == {"p50_ms": "regression", "p95_ms": "regression", "chars_p50": "regression"}
+    rows = compare(summarize([_rec(1100)] * 5), base, tolerance=0.25, length_tolerance=0.5, min_samples=3)
+    assert all(r["verdict"] == "ok" for r in rows)
+
+
+def test_compare_needs_min_samples():
+    rows = compare(summarize([_rec(5000)]), summarize([_rec(100)]), min_samples=3)
+    assert rows == [{"key": "faq_visa|en|ui", "metric": "all", "base": None, "current": None,
+                     "ratio": None, "verdict": "no_baseline"}]
+
+
+def test_run_gate_records_only_clean_runs(tmp_path):
+    path = str(tmp_path / "baseline.json")
+    first = run_gate([_rec(1000)] * 5, "run1", "fail", Baseline(path, runs=10))
+    assert not first["failed"] and len(Baseline(path).data["runs"]) == 1
+    slow = run_gate([_rec(2000)] * 5, "run2", "fail", Baseline(path, runs=10))
+    assert slow["failed"] and slow["regressions"]
+    assert [r["run_id"] for r in Baseline(path).data["runs"]] == ["run1"]
+    warn = run_gate([_rec(2000)] * 5, "run3", "warn", Baseline(path, runs=10))
+    assert not warn["failed"] and warn["regressions"]
+
+
+def test_run_gate_keeps_transports_apart_and_ignores_replays(tmp_path):
+    path = str(tmp_path / "baseline.json")
+    run_gate([_rec(200, transport="api")] * 5, "api", "record", Baseline(path))
+    ui = run_gate([_rec(3000)] * 5, "ui", "fail", Baseline(path))
+    assert not ui["failed"] and ui["rows"][0]["verdict"] == "no_baseline"
+    replay = run_gate([_rec(1, transport="api", mode="replay")] * 5, "replay", "record", Baseline(path))
+    assert replay["current"] == {} and [r["run_id"] for r in Baseline(path).data["runs"]] == ["api", "ui"]
+
+
+def test_gate_report_reaches_allure_results(tmp_path):
+    path = str(tmp_path / "baseline.json")
+    run_gate([_rec(1000)] * 5, "run1", "fail", Baseline(path))
+    report = run_gate([_rec(2000)] * 5, "run2", "fail", Baseline(path))
+    res = json.loads(open(write_allure_result(report, str(tmp_path / "allure")), encoding="utf-8").read())
+    assert res["name"] == "Latency gate" and res["status"] == "failed"
+    assert "faq_visa|en|ui p50_ms: 1000 -> 2000" in res["statusDetails"]["message"]
+    attached = json.loads((tmp_path / "allure" / res["attachments"][0]["source"]).read_text(encoding="utf-8"))
+    assert attached["regressions"] == report["regressions"]
+